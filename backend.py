@@ -4,6 +4,8 @@ from werkzeug.security import generate_password_hash, check_password_hash
 import json
 import re
 import string
+import threading
+from collections import OrderedDict
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import LabelEncoder
@@ -11,6 +13,9 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import numpy as np
 
+# Translation table that deletes ASCII punctuation, built once
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
 class IntentRecognizer:
     """
     Intent Recognition class using TF-IDF + Logistic Regression
@@ -38,6 +43,12 @@ class IntentRecognizer:
         self.intents_data = None
         self.is_trained = False
         
+        # LRU cache of predictions keyed by preprocessed text; repeated short
+        # utterances ("yes", "thanks", "bye") skip vectorizing and scoring
+        self.prediction_cache = OrderedDict()
+        self.prediction_cache_size = 1024
+        self.prediction_cache_lock = threading.Lock()
+        
         # Load and train on initialization
         self.load_intents()
         self.train_model()
@@ -72,10 +83,10 @@ class IntentRecognizer:
         text = text.lower()
         
         # Remove punctuation
-        text = text.translate(str.maketrans('', '', string.punctuation))
+        text = text.translate(PUNCTUATION_TABLE)
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = ' '.join(text.split())
         
         return text
     
@@ -147,8 +158,31 @@ class IntentRecognizer:
             print("📝 Trained on full dataset (small dataset)")
         
         self.is_trained = True
+        self.clear_prediction_cache()
         print("✅ Intent recognition model trained successfully!")
     
+    def clear_prediction_cache(self):
+        """Drop cached predictions (required whenever the model changes)"""
+        with self.prediction_cache_lock:
+            self.prediction_cache.clear()
+    
+    def _get_cached_prediction(self, processed_input):
+        """Return a copy of the cached prediction for preprocessed text, or None"""
+        with self.prediction_cache_lock:
+            cached = self.prediction_cache.get(processed_input)
+            if cached is None:
+                return None
+            self.prediction_cache.move_to_end(processed_input)
+        return {**cached, 'all_probabilities': dict(cached['all_probabilities'])}
+    
+    def _cache_prediction(self, processed_input, result):
+        """Store a prediction, evicting the least recently used entry when full"""
+        with self.prediction_cache_lock:
+            self.prediction_cache[processed_input] = result
+            self.prediction_cache.move_to_end(processed_input)
+            if len(self.prediction_cache) > self.prediction_cache_size:
+                self.prediction_cache.popitem(last=False)
+    
     def predict_intent(self, user_input):
         """
         Predict the most likely intent for user input
@@ -163,61 +197,76 @@ class IntentRecognizer:
                 'all_probabilities': dict
             }
         """
-        if not self.is_trained:
-            return {
-                'intent': 'unknown',
-                'confidence': 0.0,
-                'all_probabilities': {}
-            }
+        return self.predict_intents([user_input])[0]
+    
+    def predict_intents(self, user_inputs):
+        """
+        Predict intents for several inputs with one vectorizer/classifier pass
         
-        if not user_input or not user_input.strip():
-            return {
+        Args:
+            user_inputs (list): User input texts
+            
+        Returns:
+            list: One result dict per input, in the same order and with the
+            same shape as predict_intent
+        """
+        results = [
+            {
                 'intent': 'unknown',
                 'confidence': 0.0,
                 'all_probabilities': {}
             }
+            for _ in user_inputs
+        ]
         
-        # Preprocess input
-        processed_input = self.preprocess_text(user_input)
+        if not self.is_trained:
+            return results
+        
+        # Preprocess inputs, answering repeats from the cache and remembering
+        # which slots still need the model
+        positions = []
+        processed_inputs = []
+        for position, user_input in enumerate(user_inputs):
+            if not user_input or not user_input.strip():
+                continue
+            processed_input = self.preprocess_text(user_input)
+            if not processed_input:
+                continue
+            cached = self._get_cached_prediction(processed_input)
+            if cached is not None:
+                results[position] = cached
+            else:
+                positions.append(position)
+                processed_inputs.append(processed_input)
         
-        if not processed_input:
-            return {
-                'intent': 'unknown',
-                'confidence': 0.0,
-                'all_probabilities': {}
-            }
+        if not processed_inputs:
+            return results
         
         try:
-            # Vectorize input
-            X = self.vectorizer.transform([processed_input])
+            # Vectorize all inputs at once
+            X = self.vectorizer.transform(processed_inputs)
             
-            # Get prediction and probabilities
-            prediction = self.classifier.predict(X)[0]
-            probabilities = self.classifier.predict_proba(X)[0]
+            # Get probabilities; the prediction is their argmax, so score only once
+            probabilities = self.classifier.predict_proba(X)
+            best = probabilities.argmax(axis=1)
             
-            # Decode prediction
-            predicted_intent = self.label_encoder.inverse_transform([prediction])[0]
-            confidence = max(probabilities)
+            # Decode predictions
+            intent_names = self.label_encoder.classes_[self.classifier.classes_].tolist()
             
-            # Get all probabilities
-            all_probs = {}
-            for i, prob in enumerate(probabilities):
-                intent_name = self.label_encoder.inverse_transform([i])[0]
-                all_probs[intent_name] = float(prob)
-            
-            return {
-                'intent': predicted_intent,
-                'confidence': float(confidence),
-                'all_probabilities': all_probs
-            }
+            for row, position in enumerate(positions):
+                row_probabilities = probabilities[row].tolist()
+                result = {
+                    'intent': intent_names[best[row]],
+                    'confidence': row_probabilities[best[row]],
+                    'all_probabilities': dict(zip(intent_names, row_probabilities))
+                }
+                self._cache_prediction(processed_inputs[row], result)
+                results[position] = {**result, 'all_probabilities': dict(result['all_probabilities'])}
             
         except Exception as e:
             print(f"❌ Error predicting intent: {e}")
-            return {
-                'intent': 'unknown',
-                'confidence': 0.0,
-                'all_probabilities': {}
-            }
+        
+        return results
     
     def get_intent_info(self, intent_name):
         """
@@ -306,11 +355,9 @@ class EntityExtractor:
         if not text:
             return ""
         
-        # Convert to lowercase and strip whitespace
-        text = text.lower().strip()
-        
-        # Normalize common variations
-        text = re.sub(r'\s+', ' ', text)  # Multiple spaces to single space
+        # Convert to lowercase, strip whitespace and collapse runs of
+        # whitespace to single spaces
+        text = ' '.join(text.lower().split())
         
         return text
     
@@ -370,12 +417,7 @@ class EntityExtractor:
                 found_symptoms.append(symptom_name)
         
         # Remove duplicates while preserving order
-        unique_symptoms = []
-        for symptom in found_symptoms:
-            if symptom not in unique_symptoms:
-                unique_symptoms.append(symptom)
-        
-        return unique_symptoms
+        return list(dict.fromkeys(found_symptoms))
     
     def extract_single_entity(self, user_input):
         """
@@ -468,7 +510,8 @@ disease_predictor = None
 try:
     from disease_predictor import DiseasePredictor
     disease_predictor = DiseasePredictor()
-    if disease_predictor.load_models():
+    # The constructor already loaded (or trained) the models; don't load them twice
+    if disease_predictor.model is not None:
         print("✅ Disease prediction system loaded in backend")
     else:
         print("⚠️ Disease prediction models not found in backend")
@@ -481,7 +524,8 @@ except Exception as e:
 wellness_bot = None
 try:
     from wellness_bot import WellnessBot
-    wellness_bot = WellnessBot()
+    # Share the predictor loaded above rather than loading the model again
+    wellness_bot = WellnessBot(disease_predictor=disease_predictor)
     print("✅ Wellness bot loaded in backend")
 except Exception as e:
     print(f"⚠️ Wellness bot not available in backend: {e}")
@@ -490,10 +534,15 @@ except Exception as e:
 def get_db_connection():
     conn = sqlite3.connect(DATABASE)
     conn.row_factory = sqlite3.Row
+    # Safe under WAL (set up by init_db or setup_db.py) and avoids an fsync per commit
+    conn.execute("PRAGMA synchronous=NORMAL")
     return conn
 
 def init_db():
     conn = get_db_connection()
+    # A database created here rather than by setup_db.py (e.g. a fresh
+    # bind-mounted users.db) needs WAL too; the mode persists in the file
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -516,6 +565,12 @@ def init_db():
         )
     """)
     
+    # Conversation history is always read per user, newest first
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_conv_user_ts
+        ON conversations (username, timestamp DESC)
+    """)
+    
     conn.commit()
     conn.close()
 
@@ -582,6 +637,24 @@ def clear_user_conversations(username):
 def predict_intent():
     """API endpoint to predict intent from user input"""
     data = request.json
+    
+    # Several texts can be scored together in one classifier pass
+    texts = data.get("texts")
+    if texts is not None:
+        if not isinstance(texts, list) or not texts:
+            return jsonify({"success": False, "message": "Non-empty list of texts required"}), 400
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({"success": False, "message": "Every item in texts must be a string"}), 400
+        
+        try:
+            results = intent_recognizer.predict_intents(texts)
+            return jsonify({
+                "success": True,
+                "results": results
+            })
+        except Exception as e:
+            return jsonify({"success": False, "message": f"Error: {str(e)}"}), 500
+    
     user_input = data.get("text", "")
     
     if not user_input.strip():
@@ -249,8 +249,9 @@ class CSVKnowledgeBaseGenerator:
         """Save the knowledge base to JSON file"""
         kb = self.create_knowledge_base()
         
+        # Encode in one shot and write once; json.dump would issue a write per token chunk
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(kb, f, indent=2, ensure_ascii=False)
+            f.write(json.dumps(kb, indent=2, ensure_ascii=False))
         
         print(f"✅ Knowledge base saved to {filename}")
         print(f"   📊 {kb['total_symptoms']} symptoms")
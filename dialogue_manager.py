@@ -1,9 +1,15 @@
 """
 DialogueManager for the Wellness Bot - Simple wrapper around wellness_bot
 """
+from concurrent.futures import ThreadPoolExecutor
 from wellness_bot import initialize_bot
 import requests
 
+# One background worker shared by every DialogueManager (frontend.py keeps one
+# per Streamlit session), so conversation saves stay in order without a
+# thread per session; pending saves are flushed at interpreter exit
+_save_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="conversation-save")
+
 class DialogueManager:
     """
     Simple wrapper around the wellness_bot's reply function with conversation saving
@@ -41,9 +47,10 @@ class DialogueManager:
             # Use the wellness_bot instance's reply method which handles all the dialogue logic
             response = self.wellness_bot.reply(user_message.strip(), session_id)
             
-            # Save conversation if enabled and username provided
+            # Save conversation in the background if enabled and username
+            # provided, so the reply does not wait on the HTTP round-trip
             if self.save_conversations and username:
-                self._save_conversation(username, user_message.strip(), response)
+                _save_executor.submit(self._save_conversation, username, user_message.strip(), response)
             
             return response
         except Exception as e:
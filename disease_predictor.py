@@ -12,6 +12,14 @@ import os
 import json
 import re
 from collections import Counter
+from itertools import islice
+
+# Text patterns used on every prediction, compiled once at import
+_WORD_RE = re.compile(r'\b\w+\b')
+_FILLER_WORDS_RE = re.compile(r'\b(i|am|have|been|feel|feeling|my|the|and|or|with|very|really|quite)\b')
+
+# Common words never mapped on their own when splitting multi-word symptoms
+_COMMON_SYMPTOM_WORDS = frozenset({'pain', 'feel', 'from', 'with', 'during', 'very'})
 
 class DiseasePredictor:
     def __init__(self):
@@ -22,7 +30,11 @@ class DiseasePredictor:
         self.disease_info = {}
         self.symptom_precautions = {}
         self.all_symptoms = []
+        self.symptom_index = {}
         self.symptom_mappings = {}
+        self.disease_symptoms = {}
+        self.disease_record_counts = {}
+        self.symptom_diagnostic_weights = np.zeros(0)
         
         # Load data
         self.load_datasets()
@@ -43,19 +55,34 @@ class DiseasePredictor:
             self.df = pd.read_csv('dataset.csv')
             print(f"✅ Loaded dataset: {len(self.df)} records")
             
-            # Extract all unique symptoms
-            self.all_symptoms = set()
-            for i in range(len(self.df)):
-                for j in range(1, 18):  # Symptom_1 to Symptom_17
-                    symptom_col = f'Symptom_{j}'
-                    if symptom_col in self.df.columns:
-                        symptom = self.df.iloc[i][symptom_col]
-                        if pd.notna(symptom) and symptom.strip():
-                            self.all_symptoms.add(symptom.strip())
+            # Extract all unique symptoms column-wise instead of cell by cell
+            symptom_columns = [f'Symptom_{j}' for j in range(1, 18)  # Symptom_1 to Symptom_17
+                               if f'Symptom_{j}' in self.df.columns]
+            symptom_values = self.df[symptom_columns].stack().dropna().str.strip()
             
-            self.all_symptoms = sorted(list(self.all_symptoms))
+            present_symptoms = symptom_values[symptom_values != '']
+            
+            self.all_symptoms = sorted(set(present_symptoms))
+            self.symptom_index = {symptom: idx for idx, symptom in enumerate(self.all_symptoms)}
             print(f"✅ Extracted {len(self.all_symptoms)} unique symptoms")
             
+            # Diagnostic weight of every symptom, aligned with all_symptoms:
+            # multi-word symptoms are more specific, and rarer symptoms more
+            # telling (log-scaled rarity bonus, capped at 3x)
+            symptom_counts = present_symptoms.value_counts().reindex(self.all_symptoms).to_numpy(dtype=np.float64)
+            multi_word = np.array([len(symptom.replace('_', ' ').split()) > 1 for symptom in self.all_symptoms])
+            rarity_weights = np.minimum(3.0, np.log(5000 / np.maximum(symptom_counts, 1)) + 1)
+            self.symptom_diagnostic_weights = np.where(multi_word, 3.0, 2.0) * rarity_weights
+            
+            # Symptom set and record count of every disease, so match scoring
+            # does not rescan the dataset for each prediction
+            row_diseases = self.df['Disease'].loc[present_symptoms.index.get_level_values(0)]
+            disease_symptoms = {}
+            for disease, symptom in zip(row_diseases.to_numpy(), present_symptoms.to_numpy()):
+                disease_symptoms.setdefault(disease, set()).add(symptom)
+            self.disease_symptoms = {disease: frozenset(symptoms) for disease, symptoms in disease_symptoms.items()}
+            self.disease_record_counts = self.df['Disease'].value_counts().to_dict()
+            
             # Load disease descriptions
             desc_df = pd.read_csv('symptom_Description.csv')
             self.disease_info = dict(zip(desc_df['Disease'], desc_df['Description']))
@@ -97,7 +124,7 @@ class DiseasePredictor:
                 if len(without_underscore.split()) >= 2:
                     words = without_underscore.lower().split()
                     for word in words:
-                        if len(word) > 4 and word not in ['pain', 'feel', 'from', 'with', 'during', 'very']:  # Exclude common words
+                        if len(word) > 4 and word not in _COMMON_SYMPTOM_WORDS:  # Exclude common words
                             # Only map if it's a specific medical term
                             if word not in self.symptom_mappings or len(symptom.split('_')) >= 2:
                                 self.symptom_mappings[word] = symptom
@@ -238,48 +265,49 @@ class DiseasePredictor:
         
         # Show some sample mappings for debugging
         print(f"📋 Sample mappings:")
-        sample_items = list(self.symptom_mappings.items())[:10]
-        for key, value in sample_items:
+        for key, value in islice(self.symptom_mappings.items(), 10):
             print(f"   '{key}' → '{value}'")
     
     def extract_symptoms_from_text(self, text):
         """Extract symptoms from natural language text using improved mapping"""
         text_lower = text.lower()
-        detected_symptoms = []
+        # Insertion-ordered dict: O(1) duplicate checks while keeping detection order
+        detected_symptoms = {}
         
         print(f"🔍 Analyzing text: '{text}'")
         
         # Method 1: Direct word matching
-        words = re.findall(r'\b\w+\b', text_lower)
+        words = _WORD_RE.findall(text_lower)
         
         for word in words:
             if word in self.symptom_mappings:
                 mapped_symptom = self.symptom_mappings[word]
                 if mapped_symptom not in detected_symptoms:
-                    detected_symptoms.append(mapped_symptom)
+                    detected_symptoms[mapped_symptom] = None
                     print(f"   ✅ Mapped '{word}' → '{mapped_symptom}'")
         
         # Method 2: Phrase matching
         phrases_to_check = [
             text_lower,
             # Remove common words and check again
-            re.sub(r'\b(i|am|have|been|feel|feeling|my|the|and|or|with|very|really|quite)\b', '', text_lower).strip(),
+            _FILLER_WORDS_RE.sub('', text_lower).strip(),
         ]
         
         for phrase in phrases_to_check:
             if phrase and phrase in self.symptom_mappings:
                 mapped_symptom = self.symptom_mappings[phrase]
                 if mapped_symptom not in detected_symptoms:
-                    detected_symptoms.append(mapped_symptom)
+                    detected_symptoms[mapped_symptom] = None
                     print(f"   ✅ Mapped phrase '{phrase}' → '{mapped_symptom}'")
         
         # Method 3: Partial matching for compound symptoms
         for symptom_key, dataset_symptom in self.symptom_mappings.items():
             if len(symptom_key) > 4:  # Only check longer terms
                 if symptom_key in text_lower and dataset_symptom not in detected_symptoms:
-                    detected_symptoms.append(dataset_symptom)
+                    detected_symptoms[dataset_symptom] = None
                     print(f"   ✅ Partial match '{symptom_key}' → '{dataset_symptom}'")
         
+        detected_symptoms = list(detected_symptoms)
         print(f"🎯 Final detected symptoms: {detected_symptoms}")
         return detected_symptoms
     
@@ -304,8 +332,8 @@ class DiseasePredictor:
                         symptom = row[symptom_col]
                         if pd.notna(symptom) and symptom.strip():
                             symptom = symptom.strip()
-                            if symptom in self.all_symptoms:
-                                symptom_idx = self.all_symptoms.index(symptom)
+                            symptom_idx = self.symptom_index.get(symptom)
+                            if symptom_idx is not None:
                                 
                                 # Weight symptoms by position (earlier symptoms are more important)
                                 weight = 1.0 + (0.1 * (18 - j))  # First symptoms get higher weight
@@ -317,7 +345,8 @@ class DiseasePredictor:
                     X.append(symptom_vector)
                     y.append(row['Disease'])
             
-            X = np.array(X)
+            # Trees split on float32 internally; build X in that dtype to skip a copy
+            X = np.array(X, dtype=np.float32)
             y = np.array(y)
             
             print(f"📊 Enhanced training data: {len(X)} samples (filtered from {len(self.df)}), {len(np.unique(y))} diseases")
@@ -349,10 +378,15 @@ class DiseasePredictor:
                 min_samples_split=5,
                 min_samples_leaf=2,
                 random_state=42,
-                class_weight='balanced'  # Handle class imbalance
+                class_weight='balanced',  # Handle class imbalance
+                n_jobs=-1          # Grow trees on all cores
             )
             self.model.fit(X_train, y_train)
             
+            # n_jobs is pickled with the model; serving predicts one row at a
+            # time, where a worker pool per call costs more than it saves
+            self.model.set_params(n_jobs=None)
+            
             # Evaluate
             y_pred = self.model.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
@@ -385,41 +419,18 @@ class DiseasePredictor:
                 print("⚠️ No symptoms detected from text")
                 return []
             
-            # Create enhanced symptom vector with weighted features
-            symptom_vector = [0] * len(self.all_symptoms)
-            symptom_weights = {}
-            total_weight = 0
+            # Create enhanced symptom vector from the precomputed symptom weights
+            indices = np.array([self.symptom_index[symptom] for symptom in detected_symptoms
+                                if symptom in self.symptom_index], dtype=np.intp)
+            weights = self.symptom_diagnostic_weights[indices]
+            total_weight = float(weights.sum())
             
-            for symptom in detected_symptoms:
-                if symptom in self.all_symptoms:
-                    symptom_idx = self.all_symptoms.index(symptom)
-                    
-                    # Calculate symptom importance weight
-                    base_weight = 2.0  # Increased base weight
-                    
-                    # Give higher weight to more specific symptoms
-                    if len(symptom.replace('_', ' ').split()) > 1:
-                        base_weight += 1.0  # Increased multi-word bonus
-                    
-                    # Weight based on symptom rarity (rarer symptoms are more diagnostic)
-                    symptom_count = sum(1 for _, row in self.df.iterrows() 
-                                      for j in range(1, 18) 
-                                      if pd.notna(row.get(f'Symptom_{j}', '')) and 
-                                         row.get(f'Symptom_{j}', '').strip() == symptom)
-                    
-                    if symptom_count > 0:
-                        # Logarithmic scaling for rarity bonus
-                        rarity_weight = min(3.0, np.log(5000 / max(symptom_count, 1)) + 1)
-                        base_weight *= rarity_weight
-                    
-                    symptom_vector[symptom_idx] = base_weight
-                    symptom_weights[symptom] = base_weight
-                    total_weight += base_weight
+            symptom_vector = np.zeros((1, len(self.all_symptoms)))
+            symptom_vector[0, indices] = weights
             
-            print(f"🎯 Symptom weights: {symptom_weights}")
+            print(f"🎯 Symptom weights: {dict(zip((self.all_symptoms[i] for i in indices), weights.tolist()))}")
             
             # Predict with enhanced vector
-            symptom_vector = np.array(symptom_vector).reshape(1, -1)
             probabilities = self.model.predict_proba(symptom_vector)[0]
             
             # Apply significant confidence boosting
@@ -436,8 +447,14 @@ class DiseasePredictor:
             # Normalize to ensure valid probability distribution
             probabilities = probabilities / np.sum(probabilities)
             
-            # Get top predictions with adaptive threshold
-            top_indices = np.argsort(probabilities)[::-1][:top_k]
+            # Get top predictions with adaptive threshold; partition out the
+            # k best classes and only sort those
+            k = min(top_k, len(probabilities))
+            if k > 0:
+                candidates = np.argpartition(probabilities, -k)[-k:]
+                top_indices = candidates[np.argsort(probabilities[candidates])[::-1]]
+            else:
+                top_indices = []
             
             predictions = []
             for idx in top_indices:
@@ -452,7 +469,7 @@ class DiseasePredictor:
                     min_confidence = 0.05
                 
                 if confidence > min_confidence:
-                    disease = self.label_encoder.inverse_transform([idx])[0]
+                    disease = self.label_encoder.classes_[idx]
                     
                     # Additional disease-specific confidence boost
                     disease_symptom_match = self._calculate_disease_symptom_match(disease, detected_symptoms)
@@ -487,19 +504,9 @@ class DiseasePredictor:
     def _calculate_disease_symptom_match(self, disease, detected_symptoms):
         """Calculate how well detected symptoms match the disease profile"""
         try:
-            # Get all symptoms for this disease from the dataset
-            disease_symptoms = set()
-            disease_records = 0
-            
-            for _, row in self.df.iterrows():
-                if row['Disease'] == disease:
-                    disease_records += 1
-                    for j in range(1, 18):
-                        symptom_col = f'Symptom_{j}'
-                        if symptom_col in self.df.columns:
-                            symptom = row[symptom_col]
-                            if pd.notna(symptom) and symptom.strip():
-                                disease_symptoms.add(symptom.strip())
+            # All symptoms and records of this disease, precomputed at load time
+            disease_symptoms = self.disease_symptoms.get(disease, frozenset())
+            disease_records = self.disease_record_counts.get(disease, 0)
             
             if not disease_symptoms or disease_records == 0:
                 return 0.0
@@ -4,6 +4,13 @@ import sqlite3
 conn = sqlite3.connect("users.db")
 cursor = conn.cursor()
 
+# Write-ahead logging persists in the database file, so every later writer
+# appends to the WAL instead of rewriting pages through a rollback journal
+cursor.execute("PRAGMA journal_mode=WAL")
+cursor.execute("PRAGMA synchronous=NORMAL")
+cursor.execute("PRAGMA temp_store=MEMORY")
+cursor.execute("PRAGMA mmap_size=268435456")
+
 # Create conversations table
 cursor.execute("""
     CREATE TABLE IF NOT EXISTS conversations (
@@ -15,6 +22,12 @@ cursor.execute("""
     )
 """)
 
+# Conversation history is always read per user, newest first
+cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_conv_user_ts
+    ON conversations (username, timestamp DESC)
+""")
+
 conn.commit()
 
 # Check table
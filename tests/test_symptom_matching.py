@@ -0,0 +1,79 @@
+"""The pyahocorasick and regex symptom matchers must extract the same entities."""
+import re
+from pathlib import Path
+
+import pytest
+
+import wellness_bot
+
+KB_FILE = Path(__file__).resolve().parent.parent / 'kb_csv.json'
+
+
+@pytest.fixture(scope='module')
+def kb_data():
+    return wellness_bot._trim_knowledge_base(wellness_bot._load_json(KB_FILE))
+
+
+def _build_bot(kb_data):
+    bot = wellness_bot.WellnessBot.__new__(wellness_bot.WellnessBot)
+    bot.kb_data = kb_data
+    bot.symptom_pattern, bot.symptom_term_index = bot.build_symptom_patterns()
+    return bot
+
+
+def _reference_entities(kb_data, text):
+    """The original per-symptom search over normalized terms, one pattern per knowledge-base entry."""
+    found = []
+    for symptom in kb_data['symptoms']:
+        terms = [symptom.get('name', '')] + symptom.get('synonyms', [])
+        escaped_terms = [re.escape(wellness_bot._normalize_phrase(term)) for term in terms if term]
+        if re.search(r'\b(?:' + '|'.join(escaped_terms) + r')\b', text, re.IGNORECASE):
+            found.append(symptom.get('name', ''))
+    return tuple(found)
+
+
+def _inputs(kb_data):
+    terms = [term for symptom in kb_data['symptoms']
+             for term in [symptom.get('name', '')] + symptom.get('synonyms', []) if term]
+    yield from ("", "...", "hello", "I have a headache and fever",
+                "weakness of one body side", "irritation in anus",
+                "dischromic  patches", "spotting urination", "toxic look (typhos)x")
+    for term in terms:
+        yield term
+        yield f"I have {term} since yesterday."
+        yield f"{term}ing"
+
+
+def test_matchers_agree(kb_data, monkeypatch):
+    pytest.importorskip('ahocorasick')
+    automaton_bot = _build_bot(kb_data)
+    with monkeypatch.context() as patch:
+        patch.setattr(wellness_bot, 'ahocorasick', None)
+        regex_bot = _build_bot(kb_data)
+        regex_results = [regex_bot._extract_symptom_entities_uncached(wellness_bot._normalize_phrase(text))
+                         for text in _inputs(kb_data)]
+    
+    for text, regex_entities in zip(_inputs(kb_data), regex_results):
+        normalized = wellness_bot._normalize_phrase(text)
+        automaton_entities = automaton_bot._extract_symptom_entities_uncached(normalized)
+        assert regex_entities == automaton_entities, text
+        assert automaton_entities == _reference_entities(kb_data, normalized), text
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("weakness of one body side", ('fatigue', 'weakness_of_one_body_side')),
+    ("irritation in anus", ('internal_itching', 'irritation_in_anus', 'itching')),
+])
+def test_regex_reports_nested_terms(kb_data, monkeypatch, text, expected):
+    monkeypatch.setattr(wellness_bot, 'ahocorasick', None)
+    bot = _build_bot(kb_data)
+    assert set(expected) <= set(bot._extract_symptom_entities_uncached(text))
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("dischromic patches", 'dischromic _patches'),
+    ("spotting  urination", 'spotting_ urination'),
+])
+def test_terms_match_normalized_input(kb_data, text, expected):
+    bot = _build_bot(kb_data)
+    assert expected in bot.extract_symptom_entities(text)
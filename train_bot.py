@@ -1,15 +1,18 @@
-import json
+import argparse
+import codecs
 import os
+import orjson
+from collections import Counter
 import numpy as np
 import logging
 from datetime import datetime
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
-from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.metrics import classification_report, accuracy_score, confusion_matrix, f1_score
+from sklearn.model_selection import StratifiedShuffleSplit, cross_validate, StratifiedKFold
+from sklearn.pipeline import Pipeline
 import joblib
-import pandas as pd
 
 # Set up logging
 logging.basicConfig(
@@ -25,13 +28,13 @@ logger = logging.getLogger(__name__)
 def load_intents(file_path='bot_intents.json'):
     """Load and validate intents from JSON file."""
     try:
-        # Try with utf-8-sig first to handle BOM, then fallback to utf-8
-        try:
-            with open(file_path, 'r', encoding='utf-8-sig') as f:
-                data = json.load(f)
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+        
+        # orjson parses UTF-8 bytes directly; drop a leading BOM if present
+        if raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        data = orjson.loads(raw)
         
         if 'intents' not in data:
             raise ValueError("JSON file must contain 'intents' key")
@@ -41,54 +44,60 @@ def load_intents(file_path='bot_intents.json'):
     except FileNotFoundError:
         logger.error(f"File {file_path} not found")
         raise
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error(f"Invalid JSON format in {file_path}")
         raise
 
 def prepare_data(data):
     """Extract texts and labels from intents data."""
-    texts = []
-    labels = []
+    intents = data['intents']
     
-    for intent in data['intents']:
-        tag = intent.get('tag')
-        patterns = intent.get('patterns', [])
-        
-        if not tag:
+    for intent in intents:
+        if not intent.get('tag'):
             logger.warning(f"Intent missing 'tag' field: {intent}")
-            continue
-            
-        if not patterns:
-            logger.warning(f"Intent '{tag}' has no patterns")
-            continue
-            
-        for pattern in patterns:
-            if pattern.strip():  # Only add non-empty patterns
-                texts.append(pattern.strip())
-                labels.append(tag)
+        elif not intent.get('patterns'):
+            logger.warning(f"Intent '{intent['tag']}' has no patterns")
+    
+    # Gather patterns with an aligned tag column, then strip and drop empty
+    # patterns with vectorized NumPy string routines
+    usable = [intent for intent in intents if intent.get('tag') and intent.get('patterns')]
+    patterns = np.char.strip(np.asarray([p for intent in usable for p in intent['patterns']], dtype=str))
+    tags = np.repeat(np.asarray([intent['tag'] for intent in usable], dtype=str),
+                     [len(intent['patterns']) for intent in usable])
+    keep = patterns != ''
+    texts = patterns[keep].tolist()
+    labels = tags[keep].tolist()
     
     logger.info(f"Prepared {len(texts)} training samples across {len(set(labels))} classes")
     
     # Display class distribution
-    label_counts = pd.Series(labels).value_counts()
+    label_counts = Counter(labels)
     logger.info("Class distribution:")
-    for label, count in label_counts.items():
+    for label, count in label_counts.most_common():
         logger.info(f"  {label}: {count} samples")
     
     return texts, labels
 
 def create_models():
     """Create and configure ML models."""
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        ngram_range=(1, 2),
-        stop_words='english',
-        lowercase=True,
-        strip_accents='ascii'
-    )
+    # Stateless hashing replaces the fitted vocabulary dict; TF-IDF weighting
+    # is applied on top so the features match the previous vectorizer
+    vectorizer = Pipeline([
+        ('hash', HashingVectorizer(
+            n_features=2**14,
+            ngram_range=(1, 2),
+            stop_words='english',
+            lowercase=True,
+            strip_accents='ascii',
+            alternate_sign=False,
+            norm=None
+        )),
+        ('tfidf', TfidfTransformer())
+    ])
     
     classifier = LogisticRegression(
-        max_iter=2000,
+        solver='lbfgs',  # Multinomial; liblinear only handles two classes on current scikit-learn
+        max_iter=1000,
         random_state=42,
         C=1.0,
         class_weight='balanced'  # Handle class imbalance
@@ -98,61 +107,87 @@ def create_models():
     
     return vectorizer, classifier, label_encoder
 
-def train_and_evaluate(texts, labels):
-    """Train models and perform comprehensive evaluation."""
+def train_and_evaluate(texts, labels, run_cv=False, verbose_eval=False):
+    """Train models and perform comprehensive evaluation.
+    
+    Cross-validation only reports scores and does not select the model, so
+    its five extra fits are skipped unless run_cv is set. The per-class
+    report and confusion matrix are only built when verbose_eval is set or
+    DEBUG logging is enabled.
+    """
     logger.info("Starting model training and evaluation...")
     
     # Create models
     vectorizer, classifier, label_encoder = create_models()
     
-    # Encode labels
+    # Encode labels; a fixed-width string array lets np.unique compare in C
+    # rather than through Python object comparisons
+    labels = np.asarray(labels)
     y = label_encoder.fit_transform(labels)
     
     # Vectorize texts
     X = vectorizer.fit_transform(texts)
     
-    # Split data for proper evaluation
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    # Split data for proper evaluation; only indices are drawn, then the
+    # full matrix is released so a single copy of each split stays alive
+    splitter = StratifiedShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    train_idx, test_idx = next(splitter.split(np.zeros(len(y)), y))
+    X_train, X_test = X[train_idx], X[test_idx]
+    y_train, y_test = y[train_idx], y[test_idx]
+    del X
     
     # Train classifier
     logger.info("Training classifier...")
     classifier.fit(X_train, y_train)
+    logger.info(f"Solver finished in {classifier.n_iter_.max()} iterations (limit {classifier.max_iter})")
     
-    # Cross-validation on training data
-    cv_scores = cross_val_score(classifier, X_train, y_train, cv=5)
-    logger.info(f"Cross-validation scores: {cv_scores}")
-    logger.info(f"Average CV score: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
+    # Fortran-ordered coefficients let sparse X @ coef_.T take scipy's fast
+    # csr_matvecs path; the layout is kept when the model is saved
+    classifier.coef_ = np.asfortranarray(classifier.coef_)
+    classifier.intercept_ = np.ascontiguousarray(classifier.intercept_)
+    
+    # Cross-validation on training data, folds fitted in parallel
+    if run_cv:
+        cv_results = cross_validate(
+            classifier, X_train, y_train,
+            cv=StratifiedKFold(n_splits=5, shuffle=True, random_state=42),
+            n_jobs=-1
+        )
+        cv_scores = cv_results['test_score']
+        logger.info(f"Cross-validation scores: {cv_scores}")
+        logger.info(f"Average CV score: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
     
     # Evaluate on test set
     y_pred = classifier.predict(X_test)
     test_accuracy = accuracy_score(y_test, y_pred)
     
-    logger.info(f"Test set accuracy: {test_accuracy:.4f}")
-    
-    # Detailed classification report
-    print("\n" + "="*50)
-    print("CLASSIFICATION REPORT (Test Set)")
-    print("="*50)
-    print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
+    test_f1 = f1_score(y_test, y_pred, average='macro')
     
-    # Confusion matrix
-    cm = confusion_matrix(y_test, y_pred)
-    logger.info("Confusion Matrix:")
-    logger.info(f"\n{cm}")
+    logger.info(f"Test set accuracy: {test_accuracy:.4f}")
+    logger.info(f"Test set macro-F1: {test_f1:.4f}")
     
-    # Feature importance (top TF-IDF features for each class)
-    feature_names = vectorizer.get_feature_names_out()
-    for i, class_name in enumerate(label_encoder.classes_):
-        top_features_idx = classifier.coef_[i].argsort()[-10:][::-1]
-        top_features = [feature_names[idx] for idx in top_features_idx]
-        logger.info(f"Top features for '{class_name}': {top_features}")
+    if verbose_eval or logger.isEnabledFor(logging.DEBUG):
+        # Detailed classification report
+        print("\n" + "="*50)
+        print("CLASSIFICATION REPORT (Test Set)")
+        print("="*50)
+        print(classification_report(y_test, y_pred, target_names=label_encoder.classes_))
+        
+        # Confusion matrix
+        cm = confusion_matrix(y_test, y_pred)
+        logger.info("Confusion Matrix:")
+        logger.info(f"\n{cm}")
     
     return vectorizer, classifier, label_encoder, test_accuracy
 
-def save_models(vectorizer, classifier, label_encoder, accuracy, models_dir='models'):
-    """Save trained models and metadata."""
+def save_models(vectorizer, classifier, label_encoder, accuracy, models_dir='models', mmap=False):
+    """Save trained models and metadata.
+    
+    By default the artifacts are LZ4-compressed. With mmap=True they are
+    written uncompressed so the serving process can load them with
+    joblib.load(..., mmap_mode='r') and map the Fortran-ordered coef_
+    straight from disk; the chosen mode is recorded in metadata.json.
+    """
     os.makedirs(models_dir, exist_ok=True)
     
     # Save models
@@ -162,9 +197,13 @@ def save_models(vectorizer, classifier, label_encoder, accuracy, models_dir='mod
         'label_encoder': f'{models_dir}/label_encoder.joblib'
     }
     
-    joblib.dump(vectorizer, model_files['vectorizer'])
-    joblib.dump(classifier, model_files['classifier'])
-    joblib.dump(label_encoder, model_files['label_encoder'])
+    # LZ4 keeps the artifacts small at almost no CPU cost, which also speeds
+    # up joblib.load in the serving process; mmap mode trades disk size for
+    # arrays that are paged in only when first used
+    save_mode = 'mmap' if mmap else 'lz4'
+    compress = 0 if mmap else ('lz4', 3)
+    for name, model in (('vectorizer', vectorizer), ('classifier', classifier), ('label_encoder', label_encoder)):
+        joblib.dump(model, model_files[name], compress=compress, protocol=5)
     
     # Save metadata
     metadata = {
@@ -172,17 +211,18 @@ def save_models(vectorizer, classifier, label_encoder, accuracy, models_dir='mod
         'test_accuracy': float(accuracy),
         'n_classes': len(label_encoder.classes_),
         'classes': label_encoder.classes_.tolist(),
-        'vectorizer_features': vectorizer.max_features,
+        'vectorizer_features': vectorizer.named_steps['hash'].n_features,
+        'save_mode': save_mode,
         'model_files': model_files
     }
     
-    with open(f'{models_dir}/metadata.json', 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    with open(f'{models_dir}/metadata.json', 'wb') as f:
+        f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
     
     logger.info(f"Models and metadata saved to '{models_dir}/' folder")
     logger.info(f"Model files: {list(model_files.values())}")
 
-def main():
+def main(run_cv=False, verbose_eval=False, mmap=False):
     """Main training pipeline."""
     try:
         logger.info("Starting bot training pipeline...")
@@ -198,10 +238,12 @@ def main():
             raise ValueError("Need at least 2 different intent classes for training")
         
         # Train and evaluate
-        vectorizer, classifier, label_encoder, accuracy = train_and_evaluate(texts, labels)
+        vectorizer, classifier, label_encoder, accuracy = train_and_evaluate(
+            texts, labels, run_cv=run_cv, verbose_eval=verbose_eval
+        )
         
         # Save models
-        save_models(vectorizer, classifier, label_encoder, accuracy)
+        save_models(vectorizer, classifier, label_encoder, accuracy, mmap=mmap)
         
         logger.info(f"Training completed successfully! Final test accuracy: {accuracy:.4f}")
         
@@ -210,4 +252,12 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Train the wellness bot intent classifier.")
+    parser.add_argument('--cv', action='store_true',
+                        help="also report 5-fold cross-validation scores on the training split")
+    parser.add_argument('--verbose-eval', action='store_true',
+                        help="print the per-class report and confusion matrix for the test split")
+    parser.add_argument('--mmap', action='store_true',
+                        help="save uncompressed artifacts that can be memory-mapped on load")
+    args = parser.parse_args()
+    main(run_cv=args.cv, verbose_eval=args.verbose_eval, mmap=args.mmap)
@@ -1,18 +1,235 @@
-import json
+import asyncio
+import bisect
+import codecs
+import functools
 import joblib
+import logging
+import orjson
 import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
 from typing import Dict, Tuple, Optional, List
 import random
 
+try:
+    import ahocorasick
+except ImportError:  # optional C extension; fall back to the regex scan
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Follow-up keyword tables in one pattern; the group name is the intent
+_FOLLOWUP_KEYWORDS_RE = re.compile(
+    r'(?P<symptom_duration>how long|duration|last|persist|continue|time)'
+    r'|(?P<symptom_severity>how bad|severe|pain level|intensity|worse|better)',
+    re.IGNORECASE
+)
+
+# Columns of a session's conversation history
+_HISTORY_FIELDS = ('user_input', 'intent', 'confidence', 'entities', 'response')
+
+# Intents answered even at lower classifier confidence
+_HIGH_PRIORITY_INTENTS = frozenset({"greet", "goodbye", "thanks"})
+_SYMPTOM_RELATED_INTENTS = frozenset({"report_symptom", "symptom_duration", "symptom_severity", "ask_info"})
+
+# Replies for unrecognized input
+_FALLBACK_RESPONSES = (
+    "I'm sorry, I didn't quite understand that. Could you please rephrase your question?",
+    "I'm here to help with health-related questions. Could you tell me about any symptoms you're experiencing?",
+    "I'd like to help! Try asking about specific symptoms like headache, fever, cough, or other health concerns.",
+    "I specialize in providing basic health information. What symptoms or health topics can I help you with?"
+)
+
+def _normalize_phrase(text: str) -> str:
+    """Lowercase, trim edge punctuation and collapse whitespace for phrase and cache lookups."""
+    return ' '.join(text.lower().strip(' .,!?').split())
+
+
+def _followup_intent(user_input: str) -> Optional[str]:
+    """Return the follow-up intent a message's keywords suggest; duration wins over severity."""
+    intent = None
+    for match in _FOLLOWUP_KEYWORDS_RE.finditer(user_input):
+        if match.lastgroup == 'symptom_duration':
+            return 'symptom_duration'
+        intent = 'symptom_severity'
+    return intent
+
+
+def _confidence_level(confidence_pct: float) -> str:
+    """Describe a disease-prediction confidence percentage."""
+    return _CONFIDENCE_LABELS[bisect.bisect_right(_CONFIDENCE_THRESHOLDS, confidence_pct)]
+
+
+def _format_assessment(pred: Dict, header: str, footer: str = "") -> str:
+    """Format a display record from _display_record between a header and a footer."""
+    confidence_pct = pred['confidence'] * 100
+    parts = [
+        header,
+        f"**🎯 Most Likely Condition:** {pred['disease']}\n",
+        f"**📊 Confidence Score:** {confidence_pct:.1f}%\n",
+        f"**🔍 Detected Symptoms:** {', '.join(pred.get('detected_symptoms', []))}\n",
+        # Add confidence level interpretation
+        f"**💯 Confidence Level:** {_confidence_level(confidence_pct)}\n\n",
+        f"**📝 Description:** {pred['description_short']}\n",
+    ]
+    
+    if pred['precautions_rendered']:
+        parts.append("\n**⚠️ Recommended Precautions:**\n")
+        parts.append(pred['precautions_rendered'])
+    
+    # Show enhanced diagnostic info
+    if 'symptom_match_score' in pred:
+        parts.append(f"\n**🔗 Symptom Match Score:** {pred['symptom_match_score']:.2f}/0.5\n")
+    if 'total_symptom_weight' in pred:
+        parts.append(f"**⚖️ Total Symptom Weight:** {pred['total_symptom_weight']:.1f}\n")
+    
+    parts.append(footer)
+    return "".join(parts)
+
+
+def _display_record(pred: Dict) -> Dict:
+    """Add the display-ready description and precaution list to a disease prediction."""
+    description = pred['description']
+    return dict(
+        pred,
+        description_short=description[:200] + "..." if len(description) > 200 else description,
+        precautions_rendered="".join(
+            f"  {i}. {precaution}\n" for i, precaution in enumerate(pred['precautions'][:4], 1)
+        )
+    )
+
+
+def _load_json(path: str):
+    """Parse a UTF-8 JSON file with orjson, ignoring a leading BOM."""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if raw.startswith(codecs.BOM_UTF8):
+        raw = raw[len(codecs.BOM_UTF8):]
+    return orjson.loads(raw)
+
+
+def _trim_knowledge_base(data: Dict) -> Dict:
+    """Keep only the knowledge-base fields the bot reads.
+    
+    The CSV knowledge base also carries per-disease records and symptom
+    descriptions, frequencies and related diseases; dropping them right
+    after parsing lets the rest of the parsed tree be freed. Symptom names
+    are interned, so the extracted entities, the advice lookup and session
+    state all share one string object per symptom.
+    """
+    trimmed = {key: data[key] for key in ('total_symptoms', 'total_diseases') if key in data}
+    trimmed['symptoms'] = []
+    for symptom in data.get('symptoms', []):
+        kept = {field: symptom[field] for field in ('name', 'synonyms', 'advice') if field in symptom}
+        if isinstance(kept.get('name'), str):
+            kept['name'] = sys.intern(kept['name'])
+        trimmed['symptoms'].append(kept)
+    return trimmed
+
+
+def _is_word_char(char: str) -> bool:
+    """Return True for characters the regex \\w class matches."""
+    return char.isalnum() or char == '_'
+
+
+# Disease names that have a Hindi translation
+_TRANSLATED_DISEASES = frozenset({
+    'Arthritis', 'Heart attack', 'Drug Reaction', 'Hepatitis D', 'Diabetes', 'Hypertension', 'Migraine',
+    'Pneumonia', 'Bronchial Asthma', 'Malaria', 'Typhoid', 'Common Cold', 'Gastroenteritis', 'Urinary tract infection'
+})
+
+# Medical advice phrases, translated ahead of the general word table
+_ADVICE_TRANSLATIONS = {
+    'Rest the affected area and avoid strenuous activities': 'प्रभावित क्षेत्र को आराम दें और कठिन गतिविधियों से बचें',
+    'Apply ice or heat as appropriate': 'आवश्यकतानुसार बर्फ या गर्मी लगाएं',
+    'If symptoms persist, worsen, or you experience severe discomfort': 'यदि लक्षण बने रहें, बिगड़ जाएं, या आप गंभीर परेशानी महसूस करें',
+    'consult a healthcare professional promptly': 'तुरंत स्वास्थ्य सेवा पेशेवर से सलाह लें',
+    'Rest the affected area': 'प्रभावित क्षेत्र को आराम दें',
+    'avoid strenuous activities': 'कठिन गतिविधियों से बचें',
+    'If symptoms persist': 'यदि लक्षण बने रहें',
+    'worsen': 'बिगड़ जाएं',
+    'you experience severe discomfort': 'आप गंभीर परेशानी महसूस करें'
+}
+
+
+# Confidence levels: a percentage at or above the i-th threshold gets label i + 1
+_CONFIDENCE_THRESHOLDS = (20, 40, 60, 80)
+_CONFIDENCE_LABELS = ("Low 💡", "Low-Moderate 📊", "Moderate ⚠️", "High ✅", "Very High 🔥")
+
+# Reply templates, formatted once per reply
+_INFO_TEMPLATE = (
+    "Based on our previous conversation about {symptom}, here's additional advice:\n\n{advice}\n\n"
+    "Is there anything specific about {symptom} you'd like to know more about?"
+)
+_DURATION_TEMPLATE = (
+    "For {symptom}, the duration can vary depending on the cause. Here's what I recommend:\n\n{advice}\n\n"
+    "If symptoms persist for more than a few days or worsen, please consult a healthcare professional."
+)
+_SEVERITY_TEMPLATE = (
+    "Regarding the severity of {symptom}, it's important to monitor how it affects your daily activities. "
+    "If it's severe, persistent, or concerning you, please don't hesitate to contact a healthcare provider."
+)
+_SYMPTOM_ADVICE_TEMPLATE = (
+    "I understand you're experiencing {symptom}. Here's what I recommend:\n\n{advice}{disease_info}\n\n"
+    "⚠️ **Important:** This is general advice based on symptom analysis. "
+    "Please consult a healthcare professional for proper diagnosis and treatment."
+)
+
+# Fixed parts of the disease assessment
+_ASSESSMENT_HEADER = "\n\n🏥 **Enhanced Medical Assessment:**\n\n"
+_ASSESSMENT_RESULTS_HEADER = "🏥 **Enhanced Medical Assessment Results:**\n\n"
+_ASSESSMENT_RESULTS_FOOTER = (
+    "\n⚠️ **Important:** This is AI-based analysis. "
+    "Please consult a healthcare professional for proper diagnosis and treatment."
+)
+
+# Whitespace-delimited words for word-by-word translation
+_TOKEN_RE = re.compile(r'\S+')
+
+# Any character the regex \b treats as part of a word
+_WORD_CHAR_RE = re.compile(r'\w')
+
+# Headings and confidence levels of the disease assessment
+_ASSESSMENT_LABELS = (
+    'Enhanced Medical Assessment', 'Most Likely Condition', 'Confidence Score', 'Detected Symptoms',
+    'Confidence Level', 'Description', 'Recommended Precautions', 'Symptom Match Score',
+    'Total Symptom Weight', 'Very High', 'High', 'Moderate', 'Low-Moderate', 'Low'
+)
+
+
+def _compile_phrase_pattern(table: Dict[str, str]):
+    """Compile one alternation of a translation table's keys, longest first."""
+    return re.compile('|'.join(re.escape(key) for key in sorted(table, key=len, reverse=True)))
+
+
 class WellnessBot:
-    def __init__(self, models_dir='models', kb_file='kb.json', intents_file='bot_intents.json'):
-        """Initialize the wellness bot with trained models and knowledge base."""
+    def __init__(self, models_dir='models', kb_file='kb.json', intents_file='bot_intents.json',
+                 disease_predictor=None, max_sessions=10000):
+        """Initialize the wellness bot with trained models and knowledge base.
+        
+        An already loaded DiseasePredictor can be passed in to share it
+        instead of loading a second copy of the datasets and model. At most
+        max_sessions session contexts are kept; the least recently active
+        one is dropped when a new session would exceed the limit.
+        """
         self.models_dir = models_dir
         self.kb_file = kb_file
         self.intents_file = intents_file
         
-        # Session context storage: session_id -> {last_entity, conversation_history, language}
-        self.session_contexts = {}
+        # Session context storage: session_id -> {symptoms, last_input, conversation_history, language},
+        # in least-recently-active order; conversation_history maps each of
+        # _HISTORY_FIELDS to a column of recent turns
+        self.session_contexts = OrderedDict()
+        self.max_sessions = max_sessions
+        self.session_lock = threading.Lock()
+        
+        # Workers for disease prediction, started while the intent is classified
+        self._predict_executor = ThreadPoolExecutor(max_workers=2)
         
         # Language support
         self.supported_languages = ['english', 'hindi']
@@ -28,27 +245,106 @@ class WellnessBot:
         self.kb_data = self.load_knowledge_base()
         self.intents_data = self.load_intents()
         
+        # Per-instance generator for picking canned responses
+        self._random = random.Random()
+        self._rand_choice = self._random.choice
+        
+        # Direct lookups for advice and canned responses
+        self.advice_by_name = self.build_advice_lookup()
+        self.responses_by_tag = self.build_response_lookup()
+        
+        # Exact small-talk phrases that can be answered without the classifier
+        self.smalltalk_intents = self.build_smalltalk_lookup()
+        
         # Build symptom patterns for entity extraction
-        self.symptom_patterns = self.build_symptom_patterns()
+        self.symptom_pattern, self.symptom_term_index = self.build_symptom_patterns()
         
         # Initialize Hindi translations
         self.hindi_translations = self.load_hindi_translations()
         
+        # Advice phrases win over general terms with the same key; one
+        # longest-first pattern translates a text in a single pass
+        self.advice_translations = {**self.hindi_translations, **_ADVICE_TRANSLATIONS}
+        self.advice_translation_pattern = _compile_phrase_pattern(self.advice_translations)
+        
+        # Symptom and precaution names in the disease assessment
+        self.symptom_translations = {
+            'chest_pain': 'छाती_दर्द',
+            'stomach_pain': 'पेट_दर्द',
+            'swelling_of_stomach': 'पेट_की_सूजन',
+            'nausea': 'मतली',
+            'breathlessness': 'सांस_लेने_में_कठिनाई',
+            'muscle_weakness': 'मांसपेशी_कमजोरी',
+            'back_pain': 'पीठ_दर्द',
+            'joint_pain': 'जोड़ों_का_दर्द',
+            'high_fever': 'तेज_बुखार',
+            'headache': 'सिरदर्द',
+            'fever': 'बुखार',
+            'cough': 'खांसी'
+        }
+        self.precaution_translations = {
+            'stop irritation': 'जलन रोकें',
+            'consult nearest hospital': 'निकटतम अस्पताल से सलाह लें',
+            'stop taking drug': 'दवा लेना बंद करें',
+            'follow up': 'फॉलो अप करें',
+            'call ambulance': 'एम्बुलेंस बुलाएं',
+            'chew or swallow asprin': 'एस्प्रिन चबाएं या निगलें',
+            'keep calm': 'शांत रहें',
+            'exercise': 'व्यायाम करें',
+            'use hot and cold therapy': 'गर्म और ठंडी चिकित्सा का उपयोग करें',
+            'try acupuncture': 'एक्यूपंक्चर करें',
+            'massage': 'मालिश करें',
+            'consult doctor': 'डॉक्टर से सलाह लें',
+            'medication': 'दवा',
+            'eat healthy': 'स्वस्थ भोजन करें'
+        }
+        
+        # Everything translated in the Hindi disease assessment, in one pattern
+        self.disease_info_translations = self.build_disease_info_translations()
+        self.disease_info_translation_pattern = _compile_phrase_pattern(self.disease_info_translations)
+        
         # Initialize disease predictor
-        self.disease_predictor = None
-        self.load_disease_predictor()
+        self.disease_predictor = disease_predictor
+        if self.disease_predictor is None:
+            self.load_disease_predictor()
+        
+        # Top disease prediction per normalized input
+        self._disease_cache = functools.lru_cache(maxsize=512)(self._predict_top_disease_uncached)
+        
+        # Intent -> response handler; unknown intents get a fallback reply
+        self._dispatch = {
+            "greet": self._handle_greet,
+            "goodbye": self._handle_goodbye,
+            "thanks": self._handle_thanks,
+            "report_symptom": self._handle_report_symptom,
+            "ask_info": self._handle_info,
+            "symptom_duration": self._handle_duration,
+            "symptom_severity": self._handle_severity,
+        }
         
     def load_models(self):
         """Load the trained models."""
         try:
-            self.vectorizer = joblib.load(f'{self.models_dir}/vectorizer.joblib')
-            self.classifier = joblib.load(f'{self.models_dir}/classifier.joblib')
-            self.label_encoder = joblib.load(f'{self.models_dir}/label_encoder.joblib')
-            print("✅ Models loaded successfully")
+            # Uncompressed artifacts (train_bot.py --mmap) are memory-mapped
+            # read-only; compressed ones cannot be and are loaded normally
+            mmap_mode = 'r' if self.load_model_metadata().get('save_mode') == 'mmap' else None
+            self.vectorizer = joblib.load(f'{self.models_dir}/vectorizer.joblib', mmap_mode=mmap_mode)
+            self.classifier = joblib.load(f'{self.models_dir}/classifier.joblib', mmap_mode=mmap_mode)
+            self.label_encoder = joblib.load(f'{self.models_dir}/label_encoder.joblib', mmap_mode=mmap_mode)
+            # Fresh models invalidate any cached predictions
+            self._intent_cache = functools.lru_cache(maxsize=4096)(self._predict_intent_uncached)
+            logger.info("✅ Models loaded successfully")
         except Exception as e:
-            print(f"❌ Error loading models: {e}")
+            logger.error("❌ Error loading models: %s", e)
             raise
     
+    def load_model_metadata(self):
+        """Load the metadata written alongside the trained models."""
+        try:
+            return _load_json(f'{self.models_dir}/metadata.json')
+        except (OSError, ValueError):
+            return {}
+    
     def load_knowledge_base(self):
         """Load the symptom knowledge base."""
         try:
@@ -57,23 +353,22 @@ class WellnessBot:
                 return self.kb_data
                 
             # Fallback to original kb.json
-            with open(self.kb_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            print(f"✅ Knowledge base loaded with {len(data.get('symptoms', []))} symptoms")
+            data = _trim_knowledge_base(_load_json(self.kb_file))
+            logger.info("✅ Knowledge base loaded with %d symptoms", len(data.get('symptoms', [])))
             return data
         except Exception as e:
-            print(f"❌ Error loading knowledge base: {e}")
+            logger.error("❌ Error loading knowledge base: %s", e)
             return {"symptoms": []}
     
     def load_csv_knowledge_base(self):
         """Load the CSV-generated comprehensive knowledge base."""
         try:
-            with open('kb_csv.json', 'r', encoding='utf-8') as f:
-                self.kb_data = json.load(f)
-            print(f"✅ CSV knowledge base loaded with {self.kb_data['total_symptoms']} symptoms and {self.kb_data['total_diseases']} diseases")
+            self.kb_data = _trim_knowledge_base(_load_json('kb_csv.json'))
+            logger.info("✅ CSV knowledge base loaded with %s symptoms and %s diseases",
+                        self.kb_data['total_symptoms'], self.kb_data['total_diseases'])
             return True
         except Exception as e:
-            print(f"⚠️ Could not load CSV knowledge base: {e}")
+            logger.warning("⚠️ Could not load CSV knowledge base: %s", e)
             return False
     
     def load_disease_predictor(self):
@@ -81,46 +376,114 @@ class WellnessBot:
         try:
             from disease_predictor import DiseasePredictor
             self.disease_predictor = DiseasePredictor()
-            if self.disease_predictor.load_models():
-                print("✅ Disease prediction system loaded")
+            # The constructor already loaded (or trained) the models; don't load them twice
+            if self.disease_predictor.model is not None:
+                logger.info("✅ Disease prediction system loaded")
             else:
-                print("⚠️ Disease prediction models not found. Run disease_predictor.py first.")
+                logger.warning("⚠️ Disease prediction models not found. Run disease_predictor.py first.")
                 self.disease_predictor = None
         except Exception as e:
-            print(f"⚠️ Disease predictor not available: {e}")
+            logger.warning("⚠️ Disease predictor not available: %s", e)
             self.disease_predictor = None
     
     def load_intents(self):
         """Load the intents data for responses."""
         try:
-            # Try with utf-8-sig first to handle BOM, then fallback to utf-8
-            try:
-                with open(self.intents_file, 'r', encoding='utf-8-sig') as f:
-                    data = json.load(f)
-            except UnicodeDecodeError:
-                with open(self.intents_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            print(f"✅ Intents loaded with {len(data.get('intents', []))} intent types")
+            # A UTF-8 BOM, if present, is skipped by the loader
+            data = _load_json(self.intents_file)
+            logger.info("✅ Intents loaded with %d intent types", len(data.get('intents', [])))
             return data
         except Exception as e:
-            print(f"❌ Error loading intents: {e}")
+            logger.error("❌ Error loading intents: %s", e)
             return {"intents": []}
     
-    def build_symptom_patterns(self):
-        """Build regex patterns for symptom entity extraction."""
-        patterns = {}
+    def build_advice_lookup(self):
+        """Map each knowledge-base symptom name to its advice (first entry wins)."""
+        lookup = {}
         for symptom in self.kb_data.get('symptoms', []):
+            lookup.setdefault(symptom.get('name'), symptom.get('advice', 'No specific advice available for this symptom.'))
+        return lookup
+    
+    def build_response_lookup(self):
+        """Map each intent tag to the first non-empty list of responses, as a tuple."""
+        lookup = {}
+        for intent_data in self.intents_data.get('intents', []):
+            responses = intent_data.get('responses', [])
+            if responses:
+                lookup.setdefault(intent_data.get('tag'), tuple(responses))
+        return lookup
+    
+    def build_smalltalk_lookup(self):
+        """Map the greeting/goodbye/thanks training phrases to their intent."""
+        lookup = {}
+        for intent_data in self.intents_data.get('intents', []):
+            tag = intent_data.get('tag')
+            if tag in _HIGH_PRIORITY_INTENTS:
+                for pattern in intent_data.get('patterns', []):
+                    phrase = _normalize_phrase(pattern)
+                    if phrase:
+                        lookup[phrase] = tag
+        return lookup
+    
+    def build_symptom_patterns(self):
+        """Build a single matcher for symptom entity extraction.
+        
+        With pyahocorasick installed every normalized name and synonym goes
+        into one automaton, scanned once per input. Otherwise all terms are
+        folded into one alternation (longest term first) inside a lookahead,
+        which reports only the longest term starting at each position; the
+        shorter terms nested at the start of it are folded into its entry
+        in the returned term map. Returns the matcher and a map from
+        normalized term to the knowledge-base indexes of the symptoms it
+        names.
+        """
+        # A rebuilt matcher invalidates any cached extractions
+        self._entity_cache = functools.lru_cache(maxsize=4096)(self._extract_symptom_entities_uncached)
+        
+        term_symptoms = {}
+        self.termless_symptom_indexes = ()
+        for index, symptom in enumerate(self.kb_data.get('symptoms', [])):
             name = symptom.get('name', '')
             synonyms = symptom.get('synonyms', [])
             
-            # Create pattern from all synonyms
-            all_terms = [name] + synonyms
-            # Escape special regex characters and create word boundary pattern
-            escaped_terms = [re.escape(term) for term in all_terms if term]
-            pattern = r'\b(?:' + '|'.join(escaped_terms) + r')\b'
-            patterns[name] = re.compile(pattern, re.IGNORECASE)
+            terms = [term for term in [name] + synonyms if term]
+            if not terms:
+                self.termless_symptom_indexes += (index,)
+            for term in terms:
+                # Normalized the same way as the input, so terms with stray
+                # or doubled spaces still match
+                term = _normalize_phrase(term)
+                if term:
+                    term_symptoms.setdefault(term, []).append(index)
+        
+        if not term_symptoms:
+            return None, {}
         
-        return patterns
+        term_index = {term: tuple(dict.fromkeys(indexes)) for term, indexes in term_symptoms.items()}
+        
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for term, indexes in term_index.items():
+                automaton.add_word(term, (len(term), indexes))
+            automaton.make_automaton()
+            return automaton, term_index
+        
+        # Any shorter term matching where a longer one does is a prefix of
+        # it, and its closing word boundary falls inside the longer term, so
+        # the nested matches are known per term up front
+        nested_index = {}
+        for term, indexes in term_index.items():
+            for end in range(1, len(term)):
+                prefix = term[:end]
+                if prefix in term_index and _is_word_char(term[end - 1]) != _is_word_char(term[end]):
+                    indexes += term_index[prefix]
+            nested_index[term] = tuple(dict.fromkeys(indexes))
+        
+        # Escape special regex characters and create word boundary pattern
+        escaped_terms = [re.escape(term) for term in sorted(term_index, key=len, reverse=True)]
+        pattern = r'(?=\b(' + '|'.join(escaped_terms) + r')\b)'
+        # Terms and inputs are both normalized, so no case folding is needed
+        return re.compile(pattern), nested_index
     
     def load_hindi_translations(self):
         """Load Hindi translations for medical terms and responses."""
@@ -239,66 +602,50 @@ class WellnessBot:
             return text
             
         # Try exact match first
-        if text in self.hindi_translations:
-            return self.hindi_translations[text]
-        
-        # Try word-by-word translation for compound phrases
-        words = text.split()
-        translated_words = []
-        
-        for word in words:
-            # Remove punctuation for translation
-            clean_word = word.strip('.,!?:;')
-            if clean_word in self.hindi_translations:
-                translated_words.append(self.hindi_translations[clean_word])
-            else:
-                translated_words.append(word)  # Keep original if no translation
+        translated = self.hindi_translations.get(text)
+        if translated is not None:
+            return translated
         
-        return ' '.join(translated_words)
+        # Otherwise translate word by word, ignoring edge punctuation
+        return _TOKEN_RE.sub(
+            lambda match: self.hindi_translations.get(match.group(0).strip('.,!?:;'), match.group(0)), text
+        )
+    
+    def build_disease_info_translations(self):
+        """Collect the labels, disease names, descriptions, symptoms and precautions of the assessment."""
+        table = {label: self.hindi_translations.get(label, label) for label in _ASSESSMENT_LABELS}
+        for english, hindi in self.hindi_translations.items():
+            lowered = english.lower()
+            if (english in _TRANSLATED_DISEASES or 'adverse drug reaction' in lowered
+                    or 'heart muscle' in lowered or 'arthritis' in lowered):
+                table[english] = hindi
+        table.update(self.symptom_translations)
+        table.update(self.precaution_translations)
+        return table
+    
+    def _translate_disease_info(self, disease_info):
+        """Translate a formatted disease assessment to Hindi in a single pass."""
+        return self.disease_info_translation_pattern.sub(
+            lambda match: self.disease_info_translations[match.group(0)], disease_info
+        )
     
     def translate_complex_text_to_hindi(self, text):
         """Translate complex medical advice text to Hindi."""
         if not text:
             return text
         
-        # Define comprehensive translation patterns for medical advice
-        translations = {
-            'Rest the affected area and avoid strenuous activities': 'प्रभावित क्षेत्र को आराम दें और कठिन गतिविधियों से बचें',
-            'Apply ice or heat as appropriate': 'आवश्यकतानुसार बर्फ या गर्मी लगाएं',
-            'If symptoms persist, worsen, or you experience severe discomfort': 'यदि लक्षण बने रहें, बिगड़ जाएं, या आप गंभीर परेशानी महसूस करें',
-            'consult a healthcare professional promptly': 'तुरंत स्वास्थ्य सेवा पेशेवर से सलाह लें',
-            'Rest the affected area': 'प्रभावित क्षेत्र को आराम दें',
-            'avoid strenuous activities': 'कठिन गतिविधियों से बचें',
-            'If symptoms persist': 'यदि लक्षण बने रहें',
-            'worsen': 'बिगड़ जाएं',
-            'you experience severe discomfort': 'आप गंभीर परेशानी महसूस करें'
-        }
-        
         # Try to translate the entire text first
-        if text.strip() in translations:
-            return translations[text.strip()]
-        
-        # If not found, try partial translations
-        result = text
-        for english, hindi in translations.items():
-            result = result.replace(english, hindi)
+        if text.strip() in _ADVICE_TRANSLATIONS:
+            return _ADVICE_TRANSLATIONS[text.strip()]
         
-        # Additional word-by-word translations
-        for english, hindi in self.hindi_translations.items():
-            result = result.replace(english, hindi)
-            
-        return result
+        # Otherwise translate every known phrase and term in one pass
+        return self.advice_translation_pattern.sub(
+            lambda match: self.advice_translations[match.group(0)], text
+        )
     
     def set_language(self, session_id, language):
         """Set language preference for a session."""
-        if session_id not in self.session_contexts:
-            self.session_contexts[session_id] = {
-                'last_entity': None,
-                'conversation_history': [],
-                'language': language
-            }
-        else:
-            self.session_contexts[session_id]['language'] = language
+        self.get_session(session_id)['language'] = language
     
     def get_language(self, session_id):
         """Get language preference for a session."""
@@ -307,70 +654,130 @@ class WellnessBot:
         return self.default_language
     
     def predict_intent(self, user_input: str) -> Tuple[str, float]:
-        """Predict intent with confidence score."""
+        """Predict intent with confidence score, cached on the normalized input."""
+        return self._intent_cache(_normalize_phrase(user_input))
+    
+    def _predict_intent_uncached(self, text: str) -> Tuple[str, float]:
+        return self.predict_intent_batch([text])[0]
+    
+    def predict_intent_batch(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Predict intents for several inputs with one vectorizer and classifier call."""
+        if not texts:
+            return []
         try:
-            # Vectorize the input
-            X = self.vectorizer.transform([user_input])
+            # Vectorize the inputs. The hashing pipeline stays in sklearn:
+            # skl2onnx has no converter for HashingVectorizer, and batching
+            # already amortizes the per-call dispatch an ONNX session would save
+            X = self.vectorizer.transform(texts)
             
-            # Get prediction and confidence
-            prediction = self.classifier.predict(X)[0]
-            probabilities = self.classifier.predict_proba(X)[0]
-            confidence = max(probabilities)
+            # One scoring pass: the predicted class is the argmax of the probabilities
+            probabilities = self.classifier.predict_proba(X)
+            best = probabilities.argmax(axis=1)
+            confidences = probabilities.max(axis=1)
             
-            # Decode the prediction
-            intent = self.label_encoder.inverse_transform([prediction])[0]
+            # Decode the predictions
+            intents = self.label_encoder.classes_[self.classifier.classes_[best]]
             
-            return intent, confidence
+            return list(zip(intents.tolist(), confidences.tolist()))
         except Exception as e:
-            print(f"❌ Error predicting intent: {e}")
-            return "fallback", 0.0
+            logger.error("❌ Error predicting intent: %s", e)
+            return [("fallback", 0.0)] * len(texts)
     
     def extract_symptom_entities(self, user_input: str) -> List[str]:
-        """Extract symptom entities from user input."""
-        found_symptoms = []
+        """Extract symptom entities from user input, cached on the normalized input."""
+        # The cache holds tuples; callers get their own list
+        return list(self._entity_cache(_normalize_phrase(user_input)))
+    
+    def _extract_symptom_entities_uncached(self, text: str) -> Tuple[str, ...]:
+        # text is already lowercased by _normalize_phrase
+        found = set()
+        # A symptom without terms had an empty per-symptom pattern, which
+        # matched any input containing a word
+        if self.termless_symptom_indexes and _WORD_CHAR_RE.search(text):
+            found.update(self.termless_symptom_indexes)
         
-        for symptom_name, pattern in self.symptom_patterns.items():
-            if pattern.search(user_input):
-                found_symptoms.append(symptom_name)
+        if self.symptom_pattern is not None and ahocorasick is not None:
+            for end, (length, indexes) in self.symptom_pattern.iter(text):
+                start = end - length + 1
+                # Same word-boundary rule as the regex \b on both ends
+                before = text[start - 1] if start > 0 else ''
+                after = text[end + 1] if end + 1 < len(text) else ''
+                if (_is_word_char(before) != _is_word_char(text[start])
+                        and _is_word_char(text[end]) != _is_word_char(after)):
+                    found.update(indexes)
+        elif self.symptom_pattern is not None:
+            for match in self.symptom_pattern.finditer(text):
+                found.update(self.symptom_term_index[match.group(1)])
         
-        return found_symptoms
+        # Report symptoms in knowledge-base order, as the per-symptom scan did
+        symptoms = self.kb_data.get('symptoms', [])
+        return tuple(symptoms[index].get('name', '') for index in sorted(found))
     
     def get_symptom_advice(self, symptom_name: str) -> str:
         """Get advice for a specific symptom from knowledge base."""
-        for symptom in self.kb_data.get('symptoms', []):
-            if symptom.get('name') == symptom_name:
-                return symptom.get('advice', 'No specific advice available for this symptom.')
-        return 'Symptom not found in knowledge base.'
+        return self.advice_by_name.get(symptom_name, 'Symptom not found in knowledge base.')
     
     def get_response_by_intent(self, intent: str) -> str:
         """Get a random response for a given intent."""
-        for intent_data in self.intents_data.get('intents', []):
-            if intent_data.get('tag') == intent:
-                responses = intent_data.get('responses', [])
-                if responses:
-                    return random.choice(responses)
+        responses = self.responses_by_tag.get(intent)
+        if responses:
+            return self._rand_choice(responses)
         return "I'm not sure how to help with that."
     
-    def update_session_context(self, session_id: str, entities: List[str]):
-        """Update session context with new entities."""
-        if session_id not in self.session_contexts:
-            self.session_contexts[session_id] = {
-                'last_entity': None,
-                'conversation_history': []
-            }
+    def get_session(self, session_id: str) -> Dict:
+        """Return the context for a session, creating it if needed, and mark it active."""
+        with self.session_lock:
+            context = self.session_contexts.get(session_id)
+            if context is None:
+                context = self.session_contexts[session_id] = {
+                    # Mentioned symptoms, most recent last
+                    'symptoms': deque(maxlen=32),
+                    # One column per turn field; each deque drops the oldest
+                    # turn once ten are stored
+                    'conversation_history': {field: deque(maxlen=10) for field in _HISTORY_FIELDS},
+                    # Replies so far, and a stable per-session value that
+                    # together pick the fallback reply
+                    'turns': 0,
+                    'fallback_seed': zlib.crc32(session_id.encode('utf-8'))
+                }
+                if len(self.session_contexts) > self.max_sessions:
+                    self.session_contexts.popitem(last=False)
+            else:
+                self.session_contexts.move_to_end(session_id)
+            return context
+    
+    def update_session_context(self, session_id: str, entities: List[str], normalized_input: Optional[str] = None):
+        """Update session context with new entities and the normalized input of the turn."""
+        context = self.get_session(session_id)
+        context['turns'] += 1
+        
+        if normalized_input is not None:
+            context['last_input'] = normalized_input
         
         if entities:
-            self.session_contexts[session_id]['last_entity'] = entities[-1]  # Store the last mentioned symptom
+            context['symptoms'].extend(entities)  # The last one is the last mentioned symptom
+    
+    def get_session_stats(self, session_id: str) -> Dict:
+        """Summarize a session: its turn count, plus intent counts and mean confidence over the stored turns."""
+        context = self.session_contexts.get(session_id)
+        if context is None or not context['conversation_history']['intent']:
+            turns = context['turns'] if context is not None else 0
+            return {'turns': turns, 'stored_turns': 0, 'intent_counts': {}, 'mean_confidence': 0.0}
         
-        # Keep conversation history limited
-        if len(self.session_contexts[session_id]['conversation_history']) > 10:
-            self.session_contexts[session_id]['conversation_history'] = \
-                self.session_contexts[session_id]['conversation_history'][-10:]
+        history = context['conversation_history']
+        confidences = np.fromiter(history['confidence'], dtype=np.float32, count=len(history['confidence']))
+        return {
+            'turns': context['turns'],
+            'stored_turns': len(confidences),
+            'intent_counts': dict(Counter(history['intent'])),
+            'mean_confidence': float(confidences.mean())
+        }
     
     def get_last_symptom(self, session_id: str) -> Optional[str]:
         """Get the last mentioned symptom from session context."""
-        if session_id in self.session_contexts:
-            return self.session_contexts[session_id].get('last_entity')
+        context = self.session_contexts.get(session_id)
+        if context is not None and context['symptoms']:
+            return context['symptoms'][-1]
         return None
     
     def reply(self, user_input: str, session_id: str) -> str:
@@ -384,321 +791,286 @@ class WellnessBot:
         Returns:
             str: Bot's response
         """
-        # Predict intent with confidence
-        intent, confidence = self.predict_intent(user_input)
+        # Lowercase and normalize once; the small-talk table and the intent,
+        # entity and disease caches are all keyed on this text, which the
+        # session also keeps
+        normalized = _normalize_phrase(user_input)
+        
+        # Obvious small talk ("hi", "bye", "thanks") is a training phrase
+        # verbatim, so skip the classifier and entity scan for it
+        smalltalk_intent = self.smalltalk_intents.get(normalized)
+        disease_future = None
+        if smalltalk_intent:
+            intent, confidence, entities = smalltalk_intent, 1.0, []
+        else:
+            # Extract symptom entities
+            entities = list(self._entity_cache(normalized))
+            
+            # A turn naming a symptom is likely to need a disease prediction, so start
+            # it in the background to overlap with intent classification.
+            # The nameless knowledge-base entry matches any input and does
+            # not count; other report_symptom turns predict when replying
+            if self.disease_predictor and any(entities):
+                try:
+                    disease_future = self._predict_executor.submit(self._disease_cache, normalized)
+                except RuntimeError:
+                    # close() has shut the worker down
+                    disease_future = None
+            
+            # Predict intent with confidence
+            intent, confidence = self._intent_cache(normalized)
+        
+        try:
+            return self._respond(user_input, session_id, intent, confidence, entities, disease_future, normalized)
+        finally:
+            # A prediction the reply did not use is dropped if still queued;
+            # once running it completes and only fills the cache
+            if disease_future is not None:
+                disease_future.cancel()
+    
+    async def reply_async(self, user_input: str, session_id: str) -> str:
+        """Generate a reply without blocking the running event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.reply, user_input, session_id)
+    
+    def close(self):
+        """Stop the background prediction worker."""
+        self._predict_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def reply_batch(self, user_inputs: List[str], session_ids: List[str]) -> List[str]:
+        """
+        Generate replies for several queued messages at once.
+        
+        Intents for all non-small-talk messages are predicted in a single
+        batch; replies are then produced in order, so messages from the same
+        session see each other's context exactly as with repeated reply().
+        
+        Args:
+            user_inputs (List[str]): User messages
+            session_ids (List[str]): Session identifier for each message
+            
+        Returns:
+            List[str]: Bot responses, in input order
+        """
+        normalized = [_normalize_phrase(text) for text in user_inputs]
+        smalltalk = [self.smalltalk_intents.get(text) for text in normalized]
+        to_classify = [text for text, intent in zip(normalized, smalltalk) if not intent]
+        predictions = iter(self.predict_intent_batch(to_classify))
         
-        # Extract symptom entities
-        entities = self.extract_symptom_entities(user_input)
+        responses = []
+        for user_input, text, session_id, smalltalk_intent in zip(user_inputs, normalized, session_ids, smalltalk):
+            if smalltalk_intent:
+                intent, confidence, entities = smalltalk_intent, 1.0, []
+            else:
+                intent, confidence = next(predictions)
+                entities = list(self._entity_cache(text))
+            responses.append(self._respond(user_input, session_id, intent, confidence, entities,
+                                           normalized_input=text))
         
+        return responses
+    
+    def _respond(self, user_input: str, session_id: str, intent: str, confidence: float,
+                 entities: List[str], disease_future: Optional[Future] = None,
+                 normalized_input: Optional[str] = None) -> str:
+        """Record the turn in the session and generate the reply."""
         # Update session context
-        self.update_session_context(session_id, entities)
+        self.update_session_context(session_id, entities, normalized_input)
         
         # Log for debugging
-        print(f"🤖 Intent: {intent} (confidence: {confidence:.2f})")
-        print(f"🎯 Entities: {entities}")
+        logger.debug("🤖 Intent: %s (confidence: %.2f)", intent, confidence)
+        logger.debug("🎯 Entities: %s", entities)
         
         # Generate response based on intent and entities
-        response = self.generate_response(intent, confidence, entities, session_id, user_input)
+        response = self.generate_response(intent, confidence, entities, session_id, user_input,
+                                          disease_future=disease_future)
         
         # Add to conversation history
-        if session_id in self.session_contexts:
-            self.session_contexts[session_id]['conversation_history'].append({
-                'user_input': user_input,
-                'intent': intent,
-                'entities': entities,
-                'response': response
-            })
+        context = self.session_contexts.get(session_id)
+        if context is not None:
+            history = context['conversation_history']
+            history['user_input'].append(user_input)
+            history['intent'].append(intent)
+            history['confidence'].append(confidence)
+            history['entities'].append(entities)
+            history['response'].append(response)
         
         return response
     
+    def _fallback_response(self, session_id: str) -> str:
+        """Pick a fallback reply from the session's seed and turn count.
+        
+        The choice is reproducible per session and still varies from turn
+        to turn, without drawing from a random generator.
+        """
+        context = self.session_contexts.get(session_id)
+        if context is None:
+            index = zlib.crc32(session_id.encode('utf-8'))
+        else:
+            index = context['fallback_seed'] ^ context['turns']
+        return _FALLBACK_RESPONSES[index % len(_FALLBACK_RESPONSES)]
+    
+    def _predict_top_disease(self, user_input: str, disease_future: Optional[Future] = None):
+        """Return the top disease prediction, from disease_future when one was started."""
+        if disease_future is not None:
+            return disease_future.result()
+        return self._disease_cache(_normalize_phrase(user_input))
+    
+    def _predict_top_disease_uncached(self, text: str) -> Tuple[Dict, ...]:
+        # The cached predictions are shared between replies and only read;
+        # they carry their display strings so replies just splice them in
+        return tuple(_display_record(pred) for pred in self.disease_predictor.predict_diseases(text, top_k=1))
+    
     def generate_response(self, intent: str, confidence: float, entities: List[str], 
-                         session_id: str, user_input: str) -> str:
-        """Generate appropriate response based on intent and context."""
+                         session_id: str, user_input: str, disease_future: Optional[Future] = None) -> str:
+        """Generate appropriate response based on intent and context.
         
-        # Handle specific intents even with lower confidence
-        high_priority_intents = ["greet", "goodbye", "thanks"]
-        symptom_related_intents = ["report_symptom", "symptom_duration", "symptom_severity", "ask_info"]
+        disease_future, when given, is an already submitted top disease
+        prediction for user_input whose result is used instead of
+        predicting again.
+        """
         
         # Check if we have entities detected (symptom mentioned)
         has_entities = len(entities) > 0
         
-        # Check for duration/severity keywords in input
-        duration_keywords = ["how long", "duration", "last", "persist", "continue", "time"]
-        severity_keywords = ["how bad", "severe", "pain level", "intensity", "worse", "better"]
-        has_duration_keywords = any(keyword in user_input.lower() for keyword in duration_keywords)
-        has_severity_keywords = any(keyword in user_input.lower() for keyword in severity_keywords)
+        language = self.get_language(session_id)
         
-        # Low confidence handling with better logic
-        if confidence < 0.15:
+        # Low confidence handling with better logic; below 0.25 the same
+        # overrides apply to intents that are neither priority nor symptom-related
+        if confidence < 0.15 or (
+                confidence < 0.25 and intent not in _HIGH_PRIORITY_INTENTS and intent not in _SYMPTOM_RELATED_INTENTS):
             # If we have entities, still try to help with symptoms
             if has_entities:
                 intent = "report_symptom"  # Override low confidence if we detect symptoms
-            elif has_duration_keywords:
-                intent = "symptom_duration"  # Override for duration questions
-            elif has_severity_keywords:
-                intent = "symptom_severity"  # Override for severity questions
             else:
-                return "I'm not quite sure what you mean. Could you please rephrase your question or describe your symptoms more clearly?"
-        elif confidence < 0.25 and intent not in high_priority_intents and intent not in symptom_related_intents:
-            # For non-priority intents with low confidence, check for entity override
-            if has_entities:
-                intent = "report_symptom"
-            elif has_duration_keywords:
-                intent = "symptom_duration"
-            elif has_severity_keywords:
-                intent = "symptom_severity"
-            else:
-                return "I'm not quite sure what you mean. Could you please rephrase your question or describe your symptoms more clearly?"
-        
-        # Handle greetings
-        if intent == "greet":
-            language = self.get_language(session_id)
-            if language == 'hindi':
-                return "नमस्ते! मैं आपका स्वास्थ्य सहायक हूं। आज मैं आपकी कैसे सहायता कर सकता हूं? कृपया अपने लक्षणों के बारे में बताएं।"
-            return self.get_response_by_intent("greet")
-        
-        # Handle goodbyes
-        elif intent == "goodbye":
-            language = self.get_language(session_id)
-            if language == 'hindi':
-                return "अलविदा! अपना ख्याल रखें और स्वस्थ रहें। यदि आपको कोई और सहायता चाहिए तो कभी भी पूछें।"
-            return self.get_response_by_intent("goodbye")
+                # Override for duration or severity questions; the input is
+                # only scanned for their keywords when an override is needed
+                intent = _followup_intent(user_input)
+                if intent is None:
+                    return "I'm not quite sure what you mean. Could you please rephrase your question or describe your symptoms more clearly?"
         
-        # Handle thanks
-        elif intent == "thanks":
-            language = self.get_language(session_id)
+        handler = self._dispatch.get(intent)
+        if handler is None:
+            return self._fallback_response(session_id)
+        return handler(entities, session_id, user_input, language, disease_future)
+    
+    def _handle_greet(self, entities: List[str], session_id: str, user_input: str,
+                      language: str, disease_future: Optional[Future]) -> str:
+        """Reply to a greeting."""
+        if language == 'hindi':
+            return "नमस्ते! मैं आपका स्वास्थ्य सहायक हूं। आज मैं आपकी कैसे सहायता कर सकता हूं? कृपया अपने लक्षणों के बारे में बताएं।"
+        return self.get_response_by_intent("greet")
+    
+    def _handle_goodbye(self, entities: List[str], session_id: str, user_input: str,
+                        language: str, disease_future: Optional[Future]) -> str:
+        """Reply to a goodbye."""
+        if language == 'hindi':
+            return "अलविदा! अपना ख्याल रखें और स्वस्थ रहें। यदि आपको कोई और सहायता चाहिए तो कभी भी पूछें।"
+        return self.get_response_by_intent("goodbye")
+    
+    def _handle_thanks(self, entities: List[str], session_id: str, user_input: str,
+                       language: str, disease_future: Optional[Future]) -> str:
+        """Reply to thanks."""
+        if language == 'hindi':
+            return "आपका स्वागत है! मुझे खुशी है कि मैं आपकी सहायता कर सका। स्वस्थ रहें!"
+        return self.get_response_by_intent("thanks")
+    
+    def _handle_report_symptom(self, entities: List[str], session_id: str, user_input: str,
+                               language: str, disease_future: Optional[Future]) -> str:
+        """Give advice and a disease assessment for reported symptoms."""
+        if entities:
+            # Provide advice for the first found entity
+            symptom = entities[0]
+            advice = self.get_symptom_advice(symptom)
+            
+            # Try disease prediction if available
+            disease_info = ""
+            if self.disease_predictor:
+                try:
+                    predictions = self._predict_top_disease(user_input, disease_future)  # Only get top 1 result
+                    if predictions:
+                        pred = predictions[0]  # Get only the most confident prediction
+                        disease_info = _format_assessment(pred, _ASSESSMENT_HEADER)
+                except (KeyError, ValueError, RuntimeError):
+                    # predict_diseases handles its own failures; this covers
+                    # malformed prediction records
+                    logger.warning("Disease prediction failed", exc_info=True)
+            
+            # Format response based on language
             if language == 'hindi':
-                return "आपका स्वागत है! मुझे खुशी है कि मैं आपकी सहायता कर सका। स्वस्थ रहें!"
-            return self.get_response_by_intent("thanks")
-        
-        # Handle symptom reporting
-        elif intent == "report_symptom":
-            if entities:
-                # Provide advice for the first found entity
-                symptom = entities[0]
-                advice = self.get_symptom_advice(symptom)
-                
-                # Try disease prediction if available
-                disease_info = ""
-                if self.disease_predictor:
-                    try:
-                        predictions = self.disease_predictor.predict_diseases(user_input, top_k=1)  # Only get top 1 result
-                        if predictions:
-                            pred = predictions[0]  # Get only the most confident prediction
-                            confidence_pct = pred['confidence'] * 100
-                            
-                            disease_info = "\n\n🏥 **Enhanced Medical Assessment:**\n"
-                            disease_info += f"\n**🎯 Most Likely Condition:** {pred['disease']}\n"
-                            disease_info += f"**📊 Confidence Score:** {confidence_pct:.1f}%\n"
-                            disease_info += f"**🔍 Detected Symptoms:** {', '.join(pred['detected_symptoms'])}\n"
-                            
-                            # Add confidence level interpretation
-                            if confidence_pct >= 80:
-                                confidence_level = "Very High 🔥"
-                            elif confidence_pct >= 60:
-                                confidence_level = "High ✅"
-                            elif confidence_pct >= 40:
-                                confidence_level = "Moderate ⚠️"
-                            elif confidence_pct >= 20:
-                                confidence_level = "Low-Moderate 📊"
-                            else:
-                                confidence_level = "Low 💡"
-                            
-                            disease_info += f"**💯 Confidence Level:** {confidence_level}\n\n"
-                            disease_info += f"**� Description:** {pred['description'][:200]}...\n"
-                            
-                            if pred['precautions']:
-                                disease_info += f"\n**⚠️ Recommended Precautions:**\n"
-                                for i, precaution in enumerate(pred['precautions'][:4], 1):
-                                    disease_info += f"  {i}. {precaution}\n"
-                            
-                            # Show enhanced diagnostic info
-                            if 'symptom_match_score' in pred:
-                                disease_info += f"\n**🔗 Symptom Match Score:** {pred['symptom_match_score']:.2f}/0.5\n"
-                            if 'total_symptom_weight' in pred:
-                                disease_info += f"**⚖️ Total Symptom Weight:** {pred['total_symptom_weight']:.1f}\n"
-                    except Exception as e:
-                        print(f"Error in disease prediction: {e}")
-                
-                # Format response based on language
-                language = self.get_language(session_id)
+                # Translate advice to Hindi
+                advice_hindi = self.translate_complex_text_to_hindi(advice)
                 
-                if language == 'hindi':
-                    # Translate advice to Hindi
-                    advice_hindi = self.translate_complex_text_to_hindi(advice)
-                    
-                    # Translate disease info to Hindi if it exists
-                    if disease_info:
-                        # Apply Hindi translations to the medical assessment
-                        disease_info = disease_info.replace("Enhanced Medical Assessment", self.translate_to_hindi('Enhanced Medical Assessment'))
-                        disease_info = disease_info.replace("Most Likely Condition", self.translate_to_hindi('Most Likely Condition'))
-                        disease_info = disease_info.replace("Confidence Score", self.translate_to_hindi('Confidence Score'))  
-                        disease_info = disease_info.replace("Detected Symptoms", self.translate_to_hindi('Detected Symptoms'))
-                        disease_info = disease_info.replace("Confidence Level", self.translate_to_hindi('Confidence Level'))
-                        disease_info = disease_info.replace("Description", self.translate_to_hindi('Description'))
-                        disease_info = disease_info.replace("Recommended Precautions", self.translate_to_hindi('Recommended Precautions'))
-                        disease_info = disease_info.replace("Symptom Match Score", self.translate_to_hindi('Symptom Match Score'))
-                        disease_info = disease_info.replace("Total Symptom Weight", self.translate_to_hindi('Total Symptom Weight'))
-                        disease_info = disease_info.replace("Very High", self.translate_to_hindi('Very High'))
-                        disease_info = disease_info.replace("High", self.translate_to_hindi('High'))
-                        disease_info = disease_info.replace("Moderate", self.translate_to_hindi('Moderate'))
-                        disease_info = disease_info.replace("Low-Moderate", self.translate_to_hindi('Low-Moderate'))
-                        disease_info = disease_info.replace("Low", self.translate_to_hindi('Low'))
-                        
-                        # Translate disease names
-                        for eng_disease, hindi_disease in self.hindi_translations.items():
-                            if eng_disease in ['Arthritis', 'Heart attack', 'Drug Reaction', 'Hepatitis D', 'Diabetes', 'Hypertension', 'Migraine', 'Pneumonia', 'Bronchial Asthma', 'Malaria', 'Typhoid', 'Common Cold', 'Gastroenteritis', 'Urinary tract infection']:
-                                disease_info = disease_info.replace(eng_disease, hindi_disease)
-                        
-                        # Translate symptom names (including underscored versions)
-                        symptom_translations = {
-                            'chest_pain': 'छाती_दर्द',
-                            'stomach_pain': 'पेट_दर्द', 
-                            'swelling_of_stomach': 'पेट_की_सूजन',
-                            'nausea': 'मतली',
-                            'breathlessness': 'सांस_लेने_में_कठिनाई',
-                            'muscle_weakness': 'मांसपेशी_कमजोरी',
-                            'back_pain': 'पीठ_दर्द',
-                            'joint_pain': 'जोड़ों_का_दर्द',
-                            'high_fever': 'तेज_बुखार',
-                            'headache': 'सिरदर्द',
-                            'fever': 'बुखार',
-                            'cough': 'खांसी'
-                        }
-                        
-                        for eng_symptom, hindi_symptom in symptom_translations.items():
-                            disease_info = disease_info.replace(eng_symptom, hindi_symptom)
-                        
-                        # Translate common precautions
-                        precaution_translations = {
-                            'stop irritation': 'जलन रोकें',
-                            'consult nearest hospital': 'निकटतम अस्पताल से सलाह लें',
-                            'stop taking drug': 'दवा लेना बंद करें',
-                            'follow up': 'फॉलो अप करें',
-                            'call ambulance': 'एम्बुलेंस बुलाएं',
-                            'chew or swallow asprin': 'एस्प्रिन चबाएं या निगलें',
-                            'keep calm': 'शांत रहें',
-                            'exercise': 'व्यायाम करें',
-                            'use hot and cold therapy': 'गर्म और ठंडी चिकित्सा का उपयोग करें',
-                            'try acupuncture': 'एक्यूपंक्चर करें',
-                            'massage': 'मालिश करें',
-                            'consult doctor': 'डॉक्टर से सलाह लें',
-                            'medication': 'दवा',
-                            'eat healthy': 'स्वस्थ भोजन करें'
-                        }
-                        
-                        for eng_precaution, hindi_precaution in precaution_translations.items():
-                            disease_info = disease_info.replace(eng_precaution, hindi_precaution)
-                        
-                        # Translate medical descriptions
-                        for eng_desc, hindi_desc in self.hindi_translations.items():
-                            if 'adverse drug reaction' in eng_desc.lower() or 'heart muscle' in eng_desc.lower() or 'arthritis' in eng_desc.lower():
-                                disease_info = disease_info.replace(eng_desc, hindi_desc)
-                    
-                    understanding_text = f"{self.translate_to_hindi('I understand you are experiencing')} {self.translate_to_hindi(symptom)}। "
-                    recommendation_text = f"{self.translate_to_hindi('Here is what I recommend')}:"
-                    important_text = f"⚠️ **{self.translate_to_hindi('Important')}:** यह लक्षण विश्लेषण के आधार पर सामान्य सलाह है। उचित निदान और इलाज के लिए कृपया किसी स्वास्थ्य सेवा पेशेवर से सलाह लें।"
-                    return f"{understanding_text}{recommendation_text}\n\n{advice_hindi}{disease_info}\n\n{important_text}"
-                else:
-                    return f"I understand you're experiencing {symptom}. Here's what I recommend:\n\n{advice}{disease_info}\n\n⚠️ **Important:** This is general advice based on symptom analysis. Please consult a healthcare professional for proper diagnosis and treatment."
-            else:
-                # No entities detected by traditional extractor, but try disease prediction anyway
-                disease_info = ""
-                detected_symptoms = []
-                
-                if self.disease_predictor:
-                    try:
-                        predictions = self.disease_predictor.predict_diseases(user_input, top_k=1)  # Only get top result
-                        if predictions and len(predictions) > 0:
-                            # Show only the most confident prediction
-                            pred = predictions[0]
-                            detected_symptoms = pred.get('detected_symptoms', [])
-                            confidence_pct = pred['confidence'] * 100
-                            
-                            disease_info = "🏥 **Enhanced Medical Assessment Results:**\n\n"
-                            disease_info += f"**🎯 Most Likely Condition:** {pred['disease']}\n"
-                            disease_info += f"**📊 Confidence Score:** {confidence_pct:.1f}%\n"
-                            disease_info += f"**🔍 Detected Symptoms:** {', '.join(detected_symptoms)}\n"
-                            
-                            # Add confidence level interpretation
-                            if confidence_pct >= 80:
-                                confidence_level = "Very High 🔥"
-                            elif confidence_pct >= 60:
-                                confidence_level = "High ✅"
-                            elif confidence_pct >= 40:
-                                confidence_level = "Moderate ⚠️"
-                            elif confidence_pct >= 20:
-                                confidence_level = "Low-Moderate 📊"
-                            else:
-                                confidence_level = "Low 💡"
-                            
-                            disease_info += f"**💯 Confidence Level:** {confidence_level}\n\n"
-                            disease_info += f"**📝 Description:** {pred['description'][:200]}...\n"
-                            
-                            if pred['precautions']:
-                                disease_info += f"\n**⚠️ Recommended Precautions:**\n"
-                                for i, precaution in enumerate(pred['precautions'][:4], 1):
-                                    disease_info += f"  {i}. {precaution}\n"
-                            
-                            # Show enhanced diagnostic info
-                            if 'symptom_match_score' in pred:
-                                disease_info += f"\n**🔗 Symptom Match Score:** {pred['symptom_match_score']:.2f}/0.5\n"
-                            if 'total_symptom_weight' in pred:
-                                disease_info += f"**⚖️ Total Symptom Weight:** {pred['total_symptom_weight']:.1f}\n"
-                            
-                            disease_info += "\n⚠️ **Important:** This is AI-based analysis. Please consult a healthcare professional for proper diagnosis and treatment."
-                            
-                            return disease_info
-                    except Exception as e:
-                        print(f"Error in disease prediction: {e}")
+                # Translate disease info to Hindi if it exists
+                if disease_info:
+                    disease_info = self._translate_disease_info(disease_info)
                 
-                # If no disease prediction available or no symptoms detected
-                return "I can help with symptoms, but I need more specific information. Could you tell me exactly what symptoms you're experiencing? For example: headache, fever, cough, nausea, etc."
-        
-        # Handle information requests
-        elif intent == "ask_info":
-            last_symptom = self.get_last_symptom(session_id)
-            if last_symptom:
-                advice = self.get_symptom_advice(last_symptom)
-                return f"Based on our previous conversation about {last_symptom}, here's additional advice:\n\n{advice}\n\nIs there anything specific about {last_symptom} you'd like to know more about?"
-            else:
-                return "I'd be happy to provide health information! What specific symptom or health topic would you like to know about?"
-        
-        # Handle symptom duration questions
-        elif intent == "symptom_duration":
-            last_symptom = self.get_last_symptom(session_id)
-            if last_symptom:
-                advice = self.get_symptom_advice(last_symptom)
-                return f"For {last_symptom}, the duration can vary depending on the cause. Here's what I recommend:\n\n{advice}\n\nIf symptoms persist for more than a few days or worsen, please consult a healthcare professional."
-            else:
-                return "Could you tell me which symptom you're asking about the duration of? I can provide better guidance about how long it typically lasts and when to seek help."
-        
-        # Handle symptom severity questions
-        elif intent == "symptom_severity":
-            last_symptom = self.get_last_symptom(session_id)
-            if last_symptom:
-                return f"Regarding the severity of {last_symptom}, it's important to monitor how it affects your daily activities. If it's severe, persistent, or concerning you, please don't hesitate to contact a healthcare provider."
+                # Fixed phrases are table keys; only the symptom needs the general translator
+                understanding_text = f"{self.hindi_translations['I understand you are experiencing']} {self.translate_to_hindi(symptom)}। "
+                recommendation_text = f"{self.hindi_translations['Here is what I recommend']}:"
+                important_text = f"⚠️ **{self.hindi_translations['Important']}:** यह लक्षण विश्लेषण के आधार पर सामान्य सलाह है। उचित निदान और इलाज के लिए कृपया किसी स्वास्थ्य सेवा पेशेवर से सलाह लें।"
+                return f"{understanding_text}{recommendation_text}\n\n{advice_hindi}{disease_info}\n\n{important_text}"
             else:
-                return "I'd like to help assess severity, but could you specify which symptom you're concerned about?"
-        
-        # Handle fallback cases
+                return _SYMPTOM_ADVICE_TEMPLATE.format(symptom=symptom, advice=advice, disease_info=disease_info)
         else:
-            fallback_responses = [
-                "I'm sorry, I didn't quite understand that. Could you please rephrase your question?",
-                "I'm here to help with health-related questions. Could you tell me about any symptoms you're experiencing?",
-                "I'd like to help! Try asking about specific symptoms like headache, fever, cough, or other health concerns.",
-                "I specialize in providing basic health information. What symptoms or health topics can I help you with?"
-            ]
-            return random.choice(fallback_responses)
-
-# Global bot instance
+            # No entities detected by traditional extractor, but try disease prediction anyway
+            if self.disease_predictor:
+                try:
+                    predictions = self._predict_top_disease(user_input, disease_future)  # Only get top result
+                    if predictions and len(predictions) > 0:
+                        # Show only the most confident prediction
+                        pred = predictions[0]
+                        # A "Low" confidence guess is not worth formatting
+                        if pred['confidence'] * 100 >= _CONFIDENCE_THRESHOLDS[0]:
+                            return _format_assessment(pred, _ASSESSMENT_RESULTS_HEADER, _ASSESSMENT_RESULTS_FOOTER)
+                except (KeyError, ValueError, RuntimeError):
+                    # predict_diseases handles its own failures; this covers
+                    # malformed prediction records
+                    logger.warning("Disease prediction failed", exc_info=True)
+            
+            # If no disease prediction available, no symptoms detected or only a low-confidence guess
+            return "I can help with symptoms, but I need more specific information. Could you tell me exactly what symptoms you're experiencing? For example: headache, fever, cough, nausea, etc."
+    
+    def _handle_info(self, entities: List[str], session_id: str, user_input: str,
+                     language: str, disease_future: Optional[Future]) -> str:
+        """Give information about the last reported symptom."""
+        last_symptom = self.get_last_symptom(session_id)
+        if last_symptom:
+            advice = self.get_symptom_advice(last_symptom)
+            return _INFO_TEMPLATE.format(symptom=last_symptom, advice=advice)
+        return "I'd be happy to provide health information! What specific symptom or health topic would you like to know about?"
+    
+    def _handle_duration(self, entities: List[str], session_id: str, user_input: str,
+                         language: str, disease_future: Optional[Future]) -> str:
+        """Answer how long the last reported symptom usually lasts."""
+        last_symptom = self.get_last_symptom(session_id)
+        if last_symptom:
+            advice = self.get_symptom_advice(last_symptom)
+            return _DURATION_TEMPLATE.format(symptom=last_symptom, advice=advice)
+        return "Could you tell me which symptom you're asking about the duration of? I can provide better guidance about how long it typically lasts and when to seek help."
+    
+    def _handle_severity(self, entities: List[str], session_id: str, user_input: str,
+                         language: str, disease_future: Optional[Future]) -> str:
+        """Help assess the severity of the last reported symptom."""
+        last_symptom = self.get_last_symptom(session_id)
+        if last_symptom:
+            return _SEVERITY_TEMPLATE.format(symptom=last_symptom)
+        return "I'd like to help assess severity, but could you specify which symptom you're concerned about?"
+
+# Global bot instance, created on first use
 wellness_bot = None
+_bot_init_lock = threading.Lock()
 
 def initialize_bot():
-    """Initialize the global bot instance."""
+    """Initialize the global bot instance.
+    
+    Once created the instance is returned without locking; threads racing
+    on the first call serialize on the lock so only one bot is built.
+    """
     global wellness_bot
     if wellness_bot is None:
-        wellness_bot = WellnessBot()
+        with _bot_init_lock:
+            if wellness_bot is None:
+                wellness_bot = WellnessBot()
     return wellness_bot
 
 def reply(user_input: str, session_id: str) -> str:
@@ -717,28 +1089,32 @@ def reply(user_input: str, session_id: str) -> str:
 
 # Example usage and testing
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     # Initialize bot
     bot = initialize_bot()
     
-    # Test conversations
-    test_sessions = [
-        ("user1", "Hello"),
-        ("user1", "I have a headache"),
-        ("user1", "How can I feel better?"),
-        ("user2", "Hi there"),
-        ("user2", "I'm feeling dizzy and nauseous"),
-        ("user2", "How long does this usually last?"),
-        ("user1", "Thank you for the help"),
-        ("user1", "Goodbye"),
-    ]
+    # Test conversations, streamed rather than held in a list
+    def gen_sessions():
+        yield ("user1", "Hello")
+        yield ("user1", "I have a headache")
+        yield ("user1", "How can I feel better?")
+        yield ("user2", "Hi there")
+        yield ("user2", "I'm feeling dizzy and nauseous")
+        yield ("user2", "How long does this usually last?")
+        yield ("user1", "Thank you for the help")
+        yield ("user1", "Goodbye")
     
     print("🤖 Wellness Bot Test Conversation")
     print("=" * 50)
     
-    for session_id, message in test_sessions:
+    for session_id, message in gen_sessions():
         print(f"\n👤 [{session_id}]: {message}")
+        t0 = time.perf_counter_ns()
         response = reply(message, session_id)
+        dt = time.perf_counter_ns() - t0
         print(f"🤖 Bot: {response}")
+        print(f"   ({dt/1e6:.2f} ms)")
     
     print("\n" + "=" * 50)
     print("✅ Test completed!")